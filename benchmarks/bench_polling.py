@@ -0,0 +1,286 @@
+"""Benchmark the polling cost of the Proxmox VE integration.
+
+Sets up the integration in a Home Assistant test instance against the fake
+Proxmox VE server of `fake_pve.py`, with all the nodes and guests of the
+simulated cluster exposed, and lets the coordinators poll in real time.
+For each cluster size and API client it reports:
+
+- the setup time of the config entry,
+- the API requests per minute received by the server,
+- the executor occupancy (busy thread seconds per second) and peak threads,
+- the event loop lag, measured as the overshoot of a periodic sleep.
+
+Requires the test requirements of `requirements_test.txt` (Home Assistant
+and pytest-homeassistant-custom-component, only used for the test instance),
+run from the repository root:
+
+    python benchmarks/bench_polling.py --guests 10 100 1000 --duration 60
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+
+import urllib3
+
+from fake_pve import FakeProxmoxCluster, FakeProxmoxServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from homeassistant import loader  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.proxmoxve.const import (  # noqa: E402
+    CONF_ASYNC_CLIENT,
+    CONF_LXC,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_NODES,
+    CONF_QEMU,
+    CONF_REALM,
+    DOMAIN,
+)
+
+LAG_PROBE_INTERVAL = 0.05
+
+
+@dataclass
+class BenchmarkResult:
+    """Measures of one benchmark run."""
+
+    client: str
+    nodes: int
+    guests: int
+    setup_time: float
+    requests_per_minute: float
+    executor_occupancy: float
+    executor_peak: int
+    lag_p50: float
+    lag_p99: float
+    lag_max: float
+    endpoints: Counter[str] = field(default_factory=Counter)
+
+
+class InstrumentedExecutor(ThreadPoolExecutor):
+    """Thread pool that measures the time its threads spend running jobs."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Initialize the executor."""
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self.busy_time = 0.0
+        self.running = 0
+        self.peak = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        """Submit a job, timing it once it runs."""
+
+        def timed():
+            with self._lock:
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+            started = time.monotonic()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.busy_time += time.monotonic() - started
+
+        return super().submit(timed)
+
+    def reset(self) -> None:
+        """Forget the measures so far."""
+        with self._lock:
+            self.busy_time = 0.0
+            self.peak = self.running
+
+
+async def _async_probe_lag(lags: list[float]) -> None:
+    """Record how late the event loop wakes up from a short sleep."""
+    while True:
+        started = time.monotonic()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        lags.append(time.monotonic() - started - LAG_PROBE_INTERVAL)
+
+
+async def async_run(
+    client: str,
+    nodes: int,
+    guests: int,
+    duration: float,
+    interval: int,
+    latency: float,
+    error_rate: float,
+) -> BenchmarkResult:
+    """Run the benchmark for a cluster size and an API client."""
+    cluster = FakeProxmoxCluster(nodes, guests, seed=0)
+    server = FakeProxmoxServer(cluster, latency=latency, error_rate=error_rate, seed=0)
+    port = server.start()
+
+    loop = asyncio.get_running_loop()
+    executor = InstrumentedExecutor(max_workers=64)
+    loop.set_default_executor(executor)
+
+    hass = await async_test_home_assistant(loop)
+    hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+    lag_task: asyncio.Task | None = None
+    try:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            version=4,
+            title=f"127.0.0.1:{port}",
+            data={
+                "host": "127.0.0.1",
+                "port": port,
+                "username": "root",
+                "password": "secret",
+                CONF_REALM: "pam",
+                "verify_ssl": False,
+                CONF_NODES: cluster.nodes,
+                CONF_QEMU: [
+                    str(vm_id)
+                    for vm_id, guest in cluster.guests.items()
+                    if guest["type"] == "qemu"
+                ],
+                CONF_LXC: [
+                    str(vm_id)
+                    for vm_id, guest in cluster.guests.items()
+                    if guest["type"] == "lxc"
+                ],
+                CONF_ASYNC_CLIENT: client == "aiohttp",
+                CONF_MIN_UPDATE_INTERVAL: interval,
+                CONF_MAX_UPDATE_INTERVAL: interval,
+            },
+        )
+        entry.add_to_hass(hass)
+
+        started = time.monotonic()
+        if not await hass.config_entries.async_setup(entry.entry_id):
+            raise RuntimeError("The config entry could not be set up")
+        await hass.async_block_till_done()
+        setup_time = time.monotonic() - started
+
+        lags: list[float] = []
+        lag_task = asyncio.create_task(_async_probe_lag(lags))
+        server.reset_counters()
+        executor.reset()
+        started = time.monotonic()
+        await asyncio.sleep(duration)
+        elapsed = time.monotonic() - started
+        endpoints = Counter(server.requests)
+        busy_time = executor.busy_time
+
+        await hass.config_entries.async_unload(entry.entry_id)
+    finally:
+        if lag_task is not None:
+            lag_task.cancel()
+        await hass.async_stop(force=True)
+        server.stop()
+
+    lags.sort()
+    return BenchmarkResult(
+        client=client,
+        nodes=nodes,
+        guests=guests,
+        setup_time=setup_time,
+        requests_per_minute=sum(endpoints.values()) * 60 / elapsed,
+        executor_occupancy=busy_time / elapsed,
+        executor_peak=executor.peak,
+        lag_p50=statistics.median(lags) if lags else 0,
+        lag_p99=lags[min(int(0.99 * len(lags)), len(lags) - 1)] if lags else 0,
+        lag_max=lags[-1] if lags else 0,
+        endpoints=endpoints,
+    )
+
+
+def print_results(results: list[BenchmarkResult], verbose: bool) -> None:
+    """Print the results as a table, with the requests per endpoint if verbose."""
+    header = (
+        f"{'client':<9}{'nodes':>6}{'guests':>8}{'setup s':>9}{'req/min':>9}"
+        f"{'exec busy':>11}{'exec peak':>11}{'lag p50 ms':>12}"
+        f"{'lag p99 ms':>12}{'lag max ms':>12}"
+    )
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(
+            f"{result.client:<9}{result.nodes:>6}{result.guests:>8}"
+            f"{result.setup_time:>9.2f}{result.requests_per_minute:>9.1f}"
+            f"{result.executor_occupancy:>11.3f}{result.executor_peak:>11}"
+            f"{result.lag_p50 * 1000:>12.1f}{result.lag_p99 * 1000:>12.1f}"
+            f"{result.lag_max * 1000:>12.1f}"
+        )
+        if verbose:
+            for endpoint, count in sorted(result.endpoints.items()):
+                print(f"    {count:>7}  {endpoint}")
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--guests", type=int, nargs="+", default=[10, 100, 1000], help="cluster sizes"
+    )
+    parser.add_argument("--nodes", type=int, default=3, help="nodes in the cluster")
+    parser.add_argument(
+        "--client",
+        nargs="+",
+        choices=["executor", "aiohttp"],
+        default=["executor", "aiohttp"],
+        help="API clients to compare",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=60, help="seconds measured per run"
+    )
+    parser.add_argument(
+        "--interval", type=int, default=10, help="update interval in seconds"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.01, help="server latency in seconds"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0, help="share of failed API requests"
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="print the requests per endpoint"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    results = []
+    for guests in args.guests:
+        for client in args.client:
+            results.append(
+                asyncio.run(
+                    async_run(
+                        client,
+                        args.nodes,
+                        guests,
+                        args.duration,
+                        args.interval,
+                        args.latency,
+                        args.error_rate,
+                    )
+                )
+            )
+    print_results(results, args.verbose)
+
+
+if __name__ == "__main__":
+    main()
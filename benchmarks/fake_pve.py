@@ -0,0 +1,260 @@
+"""Stand-in Proxmox VE API server for the benchmarks.
+
+Serves the endpoints used by the integration for a simulated cluster of N
+nodes and M guests over HTTPS, with a configurable latency and error rate.
+The server runs on its own thread and event loop, so it doesn't add to the
+event loop lag measured in Home Assistant.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+import random
+import re
+import ssl
+import tempfile
+import threading
+
+from aiohttp import web
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+# Guest ids are replaced in the request counters, node names are kept
+VMID_PATTERN = re.compile(r"/(qemu|lxc)/\d+")
+
+
+class FakeProxmoxCluster:
+    """State of the simulated cluster."""
+
+    def __init__(self, nodes: int, guests: int, seed: int | None = None) -> None:
+        """Create the nodes and the guests, spread over the nodes."""
+        self._random = random.Random(seed)
+        self.nodes = [f"pve{index}" for index in range(1, nodes + 1)]
+        self.guests: dict[int, dict] = {}
+        for index in range(guests):
+            vm_id = 100 + index
+            self.guests[vm_id] = {
+                "vmid": vm_id,
+                "type": "qemu" if index % 2 == 0 else "lxc",
+                "node": self.nodes[index % nodes],
+                "name": f"guest{vm_id}",
+                "status": "running" if index % 4 else "stopped",
+                "template": 0,
+                "maxmem": 4 * 1024**3,
+                "maxdisk": 32 * 1024**3,
+                "maxswap": 512 * 1024**2,
+            }
+
+    def _guest_usage(self, guest: dict) -> dict:
+        """Return a guest row with usage values that change on every call."""
+        running = guest["status"] == "running"
+        return {
+            **guest,
+            "cpu": self._random.random() if running else 0,
+            "mem": self._random.randrange(guest["maxmem"]) if running else 0,
+            "disk": guest["maxdisk"] // 2,
+            "swap": self._random.randrange(guest["maxswap"]) if running else 0,
+            "netin": self._random.randrange(10**9) if running else 0,
+            "netout": self._random.randrange(10**9) if running else 0,
+            "uptime": 3600 if running else 0,
+        }
+
+    def _node_row(self, node: str) -> dict:
+        """Return the node row of the nodes list and cluster resources."""
+        return {
+            "node": node,
+            "status": "online",
+            "cpu": self._random.random(),
+            "maxcpu": 32,
+            "mem": 64 * 1024**3,
+            "maxmem": 128 * 1024**3,
+            "disk": 100 * 1024**3,
+            "maxdisk": 500 * 1024**3,
+            "uptime": 86400,
+        }
+
+    def resources(self) -> list[dict]:
+        """Return the /cluster/resources rows."""
+        rows = [
+            {"id": f"node/{node}", "type": "node", **self._node_row(node)}
+            for node in self.nodes
+        ]
+        for guest in self.guests.values():
+            row = self._guest_usage(guest)
+            # The cluster resources don't carry the QMP status nor the swap
+            for key in ("maxswap", "swap"):
+                row.pop(key)
+            rows.append({"id": f"{guest['type']}/{guest['vmid']}", **row})
+        return rows
+
+    def get(self, path: str) -> object:
+        """Return the data of a GET request."""
+        parts = path.strip("/").split("/")
+        if parts == ["version"]:
+            return {"version": "7.4-3", "release": "7.4"}
+        if parts == ["cluster", "resources"]:
+            return self.resources()
+        if parts == ["nodes"]:
+            return [self._node_row(node) for node in self.nodes]
+        if parts[0] != "nodes" or parts[1] not in self.nodes:
+            raise web.HTTPNotFound()
+        node = parts[1]
+        if parts[2:] == ["status"]:
+            return {
+                "cpu": self._random.random(),
+                "cpuinfo": {"model": "Fake CPU", "cpus": 32},
+                "uptime": 86400,
+                "memory": {"total": 128, "used": 64, "free": 64},
+                "swap": {"total": 8, "used": 1, "free": 7},
+                "rootfs": {"total": 500, "used": 100, "free": 400},
+            }
+        if parts[2:] == ["version"]:
+            return {"version": "7.4-3", "release": "7.4"}
+        if len(parts) == 3 and parts[2] in ("qemu", "lxc"):
+            return [
+                {
+                    **self._guest_usage(guest),
+                    "qmpstatus": guest["status"],
+                }
+                for guest in self.guests.values()
+                if guest["node"] == node and guest["type"] == parts[2]
+            ]
+        if len(parts) == 6 and parts[2] in ("qemu", "lxc") and parts[4] == "status":
+            guest = self.guests[int(parts[3])]
+            return {**self._guest_usage(guest), "qmpstatus": guest["status"]}
+        raise web.HTTPNotFound()
+
+    def post(self, path: str) -> object:
+        """Apply a command and return its task id."""
+        parts = path.strip("/").split("/")
+        if len(parts) == 6 and parts[4] == "status":
+            guest = self.guests[int(parts[3])]
+            stopping = parts[5] in ("stop", "shutdown", "hibernate", "suspend")
+            guest["status"] = "stopped" if stopping else "running"
+        return f"UPID:{parts[1]}:00000000:00000000:00000000:{parts[-1]}::root@pam:"
+
+
+class FakeProxmoxServer:
+    """HTTPS server answering like the Proxmox VE API."""
+
+    def __init__(
+        self,
+        cluster: FakeProxmoxCluster,
+        latency: float = 0,
+        error_rate: float = 0,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the server."""
+        self.cluster = cluster
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests: Counter[str] = Counter()
+        self.ticket = "PVE:ticket"
+        self._tickets = 0
+        self.port: int = 0
+        self._random = random.Random(seed)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._runner: web.AppRunner | None = None
+
+    def start(self) -> int:
+        """Start the server on a free port and return the port."""
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._async_start(), self._loop).result()
+        return self.port
+
+    def stop(self) -> None:
+        """Stop the server and its thread."""
+        if self._runner is not None:
+            asyncio.run_coroutine_threadsafe(
+                self._runner.cleanup(), self._loop
+            ).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def reset_counters(self) -> None:
+        """Forget the requests counted so far."""
+        self._loop.call_soon_threadsafe(self.requests.clear)
+
+    def expire_ticket(self) -> None:
+        """Reject the current ticket, like after a restart of the API."""
+        self._tickets += 1
+        self.ticket = f"PVE:ticket:{self._tickets}"
+
+    async def _async_start(self) -> None:
+        """Start the aiohttp application."""
+        app = web.Application()
+        app.router.add_post("/api2/json/access/ticket", self._handle_ticket)
+        app.router.add_route("*", "/api2/json/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(
+            self._runner, "127.0.0.1", 0, ssl_context=_self_signed_context()
+        )
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def _handle_ticket(self, request: web.Request) -> web.Response:
+        """Answer the password login."""
+        self.requests["POST /access/ticket"] += 1
+        await self._simulate()
+        return web.json_response(
+            {"data": {"ticket": self.ticket, "CSRFPreventionToken": "csrf"}}
+        )
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Answer the API requests."""
+        path = "/" + request.match_info["path"]
+        endpoint = VMID_PATTERN.sub(r"/\1/{vmid}", path)
+        self.requests[f"{request.method} {endpoint}"] += 1
+        await self._simulate()
+
+        ticket = request.cookies.get("PVEAuthCookie")
+        token = request.headers.get("Authorization", "").startswith("PVEAPIToken=")
+        if ticket != self.ticket and not token:
+            return web.json_response({"data": None}, status=401)
+        if self._random.random() < self.error_rate:
+            return web.json_response({"data": None}, status=500)
+
+        if request.method == "GET":
+            return web.json_response({"data": self.cluster.get(path)})
+        return web.json_response({"data": self.cluster.post(path)})
+
+    async def _simulate(self) -> None:
+        """Wait the configured latency."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+
+def _self_signed_context() -> ssl.SSLContext:
+    """Return a server SSL context with a new self-signed certificate."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.utcnow()
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    with tempfile.NamedTemporaryFile() as cert_file, tempfile.NamedTemporaryFile() as key_file:
+        cert_file.write(certificate.public_bytes(serialization.Encoding.PEM))
+        key_file.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+        cert_file.flush()
+        key_file.flush()
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_file.name, key_file.name)
+    return context
@@ -1,8 +1,9 @@
 """Support for Proxmox VE."""
 from __future__ import annotations
+from functools import partial
 from typing import Any
 
-from proxmoxer import AuthenticationError, ProxmoxAPI
+from proxmoxer import AuthenticationError
 from proxmoxer.core import ResourceException
 from requests.exceptions import (
     ConnectionError as connError,
@@ -12,7 +13,7 @@ from requests.exceptions import (
 )
 import voluptuous as vol
 
-from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
+from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry, current_entry
 from homeassistant.const import (
     CONF_HOST,
     CONF_PASSWORD,
@@ -21,10 +22,11 @@ from homeassistant.const import (
     CONF_VERIFY_SSL,
     Platform,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
-from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import device_registry as dr, entity_registry as er
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.issue_registry import (
     IssueSeverity,
@@ -32,31 +34,59 @@ from homeassistant.helpers.issue_registry import (
     async_delete_issue,
 )
 from homeassistant.helpers.typing import ConfigType
+from homeassistant.util.async_ import gather_with_concurrency
 
+from .api import ProxmoxClient
+from .commands import (
+    BULK_COMMAND_SCHEMA,
+    ProxmoxCommandQueue,
+    async_handle_bulk_command,
+)
 from .const import (
+    CLUSTER_COORDINATOR,
+    COMMAND_QUEUE,
+    CONF_ALL_GUESTS,
+    CONF_ASYNC_CLIENT,
     CONF_CONTAINERS,
+    CONF_KEEPALIVE_TIMEOUT,
     CONF_LXC,
+    CONF_MAX_CONCURRENT_REFRESH,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
     CONF_NODE,
     CONF_NODES,
+    CONF_POOL_SIZE,
     CONF_QEMU,
     CONF_REALM,
+    CONF_TOKEN_NAME,
     CONF_VMS,
     COORDINATORS,
+    DEFAULT_ALL_GUESTS,
+    DEFAULT_ASYNC_CLIENT,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_MAX_CONCURRENT_REFRESH,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_POOL_SIZE,
     DEFAULT_PORT,
     DEFAULT_REALM,
     DEFAULT_VERIFY_SSL,
     DOMAIN,
     LOGGER,
     PROXMOX_CLIENT,
+    SERVICE_BULK_COMMAND,
+    SIGNAL_RESOURCES_ADDED,
+    UPDATE_INTERVAL,
     VERSION_REMOVE_YAML,
-    ProxmoxCommand,
     ProxmoxType,
 )
 from .coordinator import (
+    ProxmoxClusterCoordinator,
+    ProxmoxGuestCoordinator,
     ProxmoxLXCCoordinator,
     ProxmoxNodeCoordinator,
     ProxmoxQEMUCoordinator,
 )
+from .models import ProxmoxClusterData
 
 PLATFORMS = [
     Platform.BINARY_SENSOR,
@@ -107,6 +137,13 @@ CONFIG_SCHEMA = vol.Schema(
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the platform."""
 
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_COMMAND,
+        partial(async_handle_bulk_command, hass),
+        schema=BULK_COMMAND_SCHEMA,
+    )
+
     # import to config flow
     if DOMAIN in config:
         LOGGER.warning(
@@ -247,6 +284,12 @@ async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry):
                 remove_config_entry_id=config_entry.entry_id,
             )
 
+    if config_entry.version == 3:
+        await async_migrate_node_unique_ids(hass, config_entry)
+
+        config_entry.version = 4
+        hass.config_entries.async_update_entry(config_entry, data=config_entry.data)
+
     LOGGER.info("Migration to version %s successful", config_entry.version)
 
     return True
@@ -273,9 +316,16 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
         realm=realm,
         password=password,
         verify_ssl=verify_ssl,
+        async_client=entry_data.get(CONF_ASYNC_CLIENT, DEFAULT_ASYNC_CLIENT),
+        pool_size=entry_data.get(CONF_POOL_SIZE, DEFAULT_POOL_SIZE),
+        keepalive_timeout=entry_data.get(
+            CONF_KEEPALIVE_TIMEOUT, DEFAULT_KEEPALIVE_TIMEOUT
+        ),
+        token_name=entry_data.get(CONF_TOKEN_NAME),
     )
+    config_entry.async_on_unload(proxmox_client.async_close)
     try:
-        await hass.async_add_executor_job(proxmox_client.build_client)
+        await proxmox_client.async_build_client(hass)
     except AuthenticationError as error:
         raise ConfigEntryAuthFailed from error
     except SSLError as error:
@@ -298,22 +348,53 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
     except ResourceException as error:
         raise ConfigEntryNotReady from error
 
-    proxmox = await hass.async_add_executor_job(proxmox_client.get_api_client)
-
     coordinators: dict[
         str | int,
         ProxmoxNodeCoordinator | ProxmoxQEMUCoordinator | ProxmoxLXCCoordinator,
     ] = {}
     nodes_add_device = []
 
-    resources = await hass.async_add_executor_job(proxmox.cluster.resources.get)
-    LOGGER.debug("API Response - Resources: %s", resources)
+    min_update_interval = entry_data.get(CONF_MIN_UPDATE_INTERVAL, UPDATE_INTERVAL)
+    max_update_interval = entry_data.get(
+        CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+    )
+
+    coordinator_cluster = ProxmoxClusterCoordinator(
+        hass=hass,
+        proxmox_client=proxmox_client,
+        host_name=config_entry.data[CONF_HOST],
+        watched_nodes=set(entry_data[CONF_NODES]),
+        watched_guests={
+            int(vm_id) for vm_id in (*entry_data[CONF_QEMU], *entry_data[CONF_LXC])
+        },
+        min_update_interval=min_update_interval,
+        max_update_interval=max_update_interval,
+    )
+    await coordinator_cluster.async_refresh()
+    if coordinator_cluster.data is None:
+        raise ConfigEntryNotReady(
+            f"Unable to fetch the cluster resources of host {host}"
+        ) from coordinator_cluster.last_exception
+
+    # Discovery snapshot, the configured resources are checked against it
+    try:
+        nodes_api = await proxmox_client.async_get("nodes")
+    except (ResourceException, ConnectTimeout, connError) as error:
+        raise ConfigEntryNotReady(
+            f"Unable to fetch the nodes of host {host}"
+        ) from error
+
+    resources_discovered: dict[ProxmoxType, set[str]] = {
+        ProxmoxType.Node: {node_api[CONF_NODE] for node_api in nodes_api},
+        ProxmoxType.QEMU: set(),
+        ProxmoxType.LXC: set(),
+    }
+    for resource in coordinator_cluster.data.resources:
+        if resource.get("type") in (ProxmoxType.QEMU, ProxmoxType.LXC):
+            resources_discovered[resource["type"]].add(str(resource["vmid"]))
 
     for node in config_entry.data[CONF_NODES]:
-        if node in [
-            node_proxmox["node"]
-            for node_proxmox in await hass.async_add_executor_job(proxmox.nodes().get)
-        ]:
+        if node in resources_discovered[ProxmoxType.Node]:
             async_delete_issue(
                 hass,
                 DOMAIN,
@@ -321,14 +402,14 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
             )
             coordinator_node = ProxmoxNodeCoordinator(
                 hass=hass,
-                proxmox=proxmox,
+                proxmox_client=proxmox_client,
+                cluster_coordinator=coordinator_cluster,
                 host_name=config_entry.data[CONF_HOST],
                 node_name=node,
+                min_update_interval=min_update_interval,
+                max_update_interval=max_update_interval,
             )
-            await coordinator_node.async_refresh()
             coordinators[node] = coordinator_node
-            if coordinator_node.data is not None:
-                nodes_add_device.append(node)
         else:
             async_create_issue(
                 hass,
@@ -347,11 +428,19 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
                 },
             )
 
-    for vm_id in config_entry.data[CONF_QEMU]:
-        if int(vm_id) in [
-            (int(resource["vmid"]) if "vmid" in resource else None)
-            for resource in resources
-        ]:
+    if entry_data.get(CONF_ALL_GUESTS, DEFAULT_ALL_GUESTS):
+        # Every guest of the cluster is exposed, the selected guests are ignored
+        qemu_ids = sorted(resources_discovered[ProxmoxType.QEMU], key=int)
+        lxc_ids = sorted(resources_discovered[ProxmoxType.LXC], key=int)
+        coordinator_cluster.watched_guests = {
+            int(vm_id) for vm_id in (*qemu_ids, *lxc_ids)
+        }
+    else:
+        qemu_ids = entry_data[CONF_QEMU]
+        lxc_ids = entry_data[CONF_LXC]
+
+    for vm_id in qemu_ids:
+        if str(vm_id) in resources_discovered[ProxmoxType.QEMU]:
             async_delete_issue(
                 hass,
                 DOMAIN,
@@ -359,11 +448,10 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
             )
             coordinator_qemu = ProxmoxQEMUCoordinator(
                 hass=hass,
-                proxmox=proxmox,
+                cluster_coordinator=coordinator_cluster,
                 host_name=config_entry.data[CONF_HOST],
                 qemu_id=vm_id,
             )
-            await coordinator_qemu.async_refresh()
             coordinators[vm_id] = coordinator_qemu
         else:
             async_create_issue(
@@ -383,11 +471,8 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
                 },
             )
 
-    for container_id in config_entry.data[CONF_LXC]:
-        if int(container_id) in [
-            (int(resource["vmid"]) if "vmid" in resource else None)
-            for resource in resources
-        ]:
+    for container_id in lxc_ids:
+        if str(container_id) in resources_discovered[ProxmoxType.LXC]:
             async_delete_issue(
                 hass,
                 DOMAIN,
@@ -395,11 +480,10 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
             )
             coordinator_lxc = ProxmoxLXCCoordinator(
                 hass=hass,
-                proxmox=proxmox,
+                cluster_coordinator=coordinator_cluster,
                 host_name=config_entry.data[CONF_HOST],
                 container_id=container_id,
             )
-            await coordinator_lxc.async_refresh()
             coordinators[container_id] = coordinator_lxc
         else:
             async_create_issue(
@@ -419,9 +503,26 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
                 },
             )
 
+    async_spread_phases(coordinator_cluster, coordinators)
+
+    # First refresh of all resources at once, limited to not overload the API
+    await gather_with_concurrency(
+        entry_data.get(CONF_MAX_CONCURRENT_REFRESH, DEFAULT_MAX_CONCURRENT_REFRESH),
+        *(coordinator.async_refresh() for coordinator in coordinators.values()),
+    )
+
+    for node in config_entry.data[CONF_NODES]:
+        if node in coordinators and coordinators[node].data is not None:
+            nodes_add_device.append(node)
+
+    command_queue = ProxmoxCommandQueue(hass, proxmox_client)
+    config_entry.async_on_unload(command_queue.async_cancel)
+
     hass.data[DOMAIN][config_entry.entry_id] = {
         PROXMOX_CLIENT: proxmox_client,
+        CLUSTER_COORDINATOR: coordinator_cluster,
         COORDINATORS: coordinators,
+        COMMAND_QUEUE: command_queue,
     }
 
     for node in nodes_add_device:
@@ -433,6 +534,18 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
             create=True,
         )
 
+    config_entry.async_on_unload(
+        coordinator_cluster.async_add_listener(
+            partial(
+                async_follow_cluster_guests,
+                hass,
+                config_entry,
+                coordinator_cluster,
+                coordinators,
+            )
+        )
+    )
+
     for platform in PLATFORMS:
         hass.async_create_task(
             hass.config_entries.async_forward_entry_setup(config_entry, platform)
@@ -441,10 +554,291 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
     return True
 
 
+async def async_migrate_node_unique_ids(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> None:
+    """Add the node name to the unique ID of the node sensors.
+
+    They had "None" in place of the node, so only the sensors of one node
+    were registered and the ones of the other nodes were dropped.
+    """
+    dev_reg = dr.async_get(hass)
+    old_prefix = f"{config_entry.entry_id}_None_"
+    node_prefix = f"{config_entry.entry_id}_{ProxmoxType.Node.upper()}_"
+
+    @callback
+    def migrate_unique_id(entity_entry: er.RegistryEntry) -> dict[str, Any] | None:
+        """Return the unique ID with the node of the device of the entity."""
+        if (
+            not entity_entry.unique_id.startswith(old_prefix)
+            or entity_entry.device_id is None
+            or (device := dev_reg.async_get(entity_entry.device_id)) is None
+        ):
+            return None
+        for domain, identifier in device.identifiers:
+            if domain == DOMAIN and identifier.startswith(node_prefix):
+                node = identifier.removeprefix(node_prefix)
+                key = entity_entry.unique_id.removeprefix(old_prefix)
+                LOGGER.debug("Migrate %s to the node %s", entity_entry.entity_id, node)
+                return {"new_unique_id": f"{config_entry.entry_id}_{node}_{key}"}
+        return None
+
+    await er.async_migrate_entries(hass, config_entry.entry_id, migrate_unique_id)
+
+
+@callback
+def async_spread_phases(
+    coordinator_cluster: ProxmoxClusterCoordinator,
+    coordinators: dict[
+        str | int,
+        ProxmoxNodeCoordinator | ProxmoxQEMUCoordinator | ProxmoxLXCCoordinator,
+    ],
+) -> None:
+    """Spread the polls of the entry evenly over the update interval."""
+    scheduled = [
+        coordinator_cluster,
+        *(
+            coordinator
+            for coordinator in coordinators.values()
+            if isinstance(coordinator, ProxmoxNodeCoordinator)
+        ),
+    ]
+    for index, coordinator in enumerate(scheduled):
+        coordinator.schedule.phase = index / len(scheduled)
+
+
+async def async_update_exposed_resources(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> None:
+    """Apply a change of the exposed resources to a loaded config entry.
+
+    Only the coordinators, devices and entities of the nodes and guests that
+    were added or removed are touched, the API client, the cluster
+    coordinator and the resources still exposed are kept.
+    """
+    entry_data = config_entry.data
+    coordinator_cluster: ProxmoxClusterCoordinator = hass.data[DOMAIN][
+        config_entry.entry_id
+    ][CLUSTER_COORDINATOR]
+    coordinators = hass.data[DOMAIN][config_entry.entry_id][COORDINATORS]
+
+    nodes = [
+        node
+        for node in entry_data[CONF_NODES]
+        if node in coordinator_cluster.data.nodes
+    ]
+    for node, coordinator in list(coordinators.items()):
+        if isinstance(coordinator, ProxmoxNodeCoordinator) and node not in nodes:
+            LOGGER.debug("Remove node %s, not exposed anymore", node)
+            del coordinators[node]
+            coordinator.async_detach()
+            async_remove_resource_device(hass, config_entry, ProxmoxType.Node, node)
+
+    added_nodes: list[ProxmoxNodeCoordinator] = []
+    # The coordinators are linked to the config entry they are created in
+    token = current_entry.set(config_entry)
+    try:
+        for node in nodes:
+            if node in coordinators:
+                continue
+            LOGGER.debug("Add node %s, newly exposed", node)
+            coordinators[node] = ProxmoxNodeCoordinator(
+                hass=hass,
+                proxmox_client=coordinator_cluster.proxmox_client,
+                cluster_coordinator=coordinator_cluster,
+                host_name=entry_data[CONF_HOST],
+                node_name=node,
+                min_update_interval=entry_data.get(
+                    CONF_MIN_UPDATE_INTERVAL, UPDATE_INTERVAL
+                ),
+                max_update_interval=entry_data.get(
+                    CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+                ),
+            )
+            added_nodes.append(coordinators[node])
+    finally:
+        current_entry.reset(token)
+
+    coordinator_cluster.watched_nodes = set(entry_data[CONF_NODES])
+    async_spread_phases(coordinator_cluster, coordinators)
+    await gather_with_concurrency(
+        entry_data.get(CONF_MAX_CONCURRENT_REFRESH, DEFAULT_MAX_CONCURRENT_REFRESH),
+        *(coordinator.async_refresh() for coordinator in added_nodes),
+    )
+    for coordinator in added_nodes:
+        if coordinator.data is not None:
+            device_info(
+                hass=hass,
+                config_entry=config_entry,
+                api_category=ProxmoxType.Node,
+                node=coordinator.node_name,
+                create=True,
+            )
+
+    added = [
+        *added_nodes,
+        *async_update_guests(
+            hass,
+            config_entry,
+            coordinator_cluster,
+            coordinators,
+            exposed_guests(config_entry, coordinator_cluster.data),
+        ),
+    ]
+    if added:
+        async_dispatcher_send(
+            hass, SIGNAL_RESOURCES_ADDED.format(config_entry.entry_id), added
+        )
+
+
+@callback
+def async_follow_cluster_guests(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    coordinator_cluster: ProxmoxClusterCoordinator,
+    coordinators: dict[
+        str | int,
+        ProxmoxNodeCoordinator | ProxmoxQEMUCoordinator | ProxmoxLXCCoordinator,
+    ],
+) -> None:
+    """Add and remove guests to follow the cluster snapshot, in all guests mode."""
+    if (
+        not config_entry.data.get(CONF_ALL_GUESTS, DEFAULT_ALL_GUESTS)
+        or not coordinator_cluster.last_update_success
+    ):
+        return
+
+    if added := async_update_guests(
+        hass,
+        config_entry,
+        coordinator_cluster,
+        coordinators,
+        exposed_guests(config_entry, coordinator_cluster.data),
+    ):
+        async_dispatcher_send(
+            hass, SIGNAL_RESOURCES_ADDED.format(config_entry.entry_id), added
+        )
+
+
+def exposed_guests(
+    config_entry: ConfigEntry, cluster_data: ProxmoxClusterData
+) -> dict[str | int, ProxmoxType]:
+    """Return the type of the exposed guests found in the cluster snapshot.
+
+    The guests are keyed like the coordinators of the entry: by the ID in the
+    config entry, or by the string ID in all guests mode.
+    """
+    if config_entry.data.get(CONF_ALL_GUESTS, DEFAULT_ALL_GUESTS):
+        return {
+            str(vm_id): resource["type"]
+            for vm_id, resource in cluster_data.guests.items()
+            if resource.get("type") in (ProxmoxType.QEMU, ProxmoxType.LXC)
+        }
+
+    guests: dict[str | int, ProxmoxType] = {}
+    for api_category, conf_guests in (
+        (ProxmoxType.QEMU, CONF_QEMU),
+        (ProxmoxType.LXC, CONF_LXC),
+    ):
+        for vm_id in config_entry.data[conf_guests]:
+            resource = cluster_data.guests.get(int(vm_id))
+            if resource is not None and resource.get("type") == api_category:
+                guests[vm_id] = api_category
+    return guests
+
+
+@callback
+def async_update_guests(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    coordinator_cluster: ProxmoxClusterCoordinator,
+    coordinators: dict[
+        str | int,
+        ProxmoxNodeCoordinator | ProxmoxQEMUCoordinator | ProxmoxLXCCoordinator,
+    ],
+    guests: dict[str | int, ProxmoxType],
+) -> list[ProxmoxQEMUCoordinator | ProxmoxLXCCoordinator]:
+    """Create and remove the guest coordinators to match the exposed guests.
+
+    The devices of the removed guests are removed with their entities,
+    returns the coordinators created, the platforms add their entities when
+    SIGNAL_RESOURCES_ADDED is sent.
+    """
+    tracked_guests = {
+        resource_id: coordinator.api_category
+        for resource_id, coordinator in coordinators.items()
+        if isinstance(coordinator, ProxmoxGuestCoordinator)
+    }
+
+    # A guest id reused by a guest of the other type is removed and added again
+    for vm_id, api_category in tracked_guests.items():
+        if guests.get(vm_id) == api_category:
+            continue
+        LOGGER.debug("Remove %s %s, not exposed anymore", api_category, vm_id)
+        coordinators.pop(vm_id).async_detach()
+        coordinator_cluster.watched_guests.discard(int(vm_id))
+        async_remove_resource_device(hass, config_entry, api_category, vm_id)
+
+    added: list[ProxmoxQEMUCoordinator | ProxmoxLXCCoordinator] = []
+    # In the config entry context, a coordinator would add an unload
+    # callback to the entry for each guest coming and going. The guest
+    # coordinators take the entry of the cluster coordinator instead and are
+    # detached on unload by async_unload_entry.
+    token = current_entry.set(None)
+    try:
+        for vm_id, api_category in guests.items():
+            if vm_id in coordinators:
+                continue
+            LOGGER.debug("Add %s %s, newly exposed", api_category, vm_id)
+            coordinator: ProxmoxQEMUCoordinator | ProxmoxLXCCoordinator
+            if api_category == ProxmoxType.QEMU:
+                coordinator = ProxmoxQEMUCoordinator(
+                    hass=hass,
+                    cluster_coordinator=coordinator_cluster,
+                    host_name=config_entry.data[CONF_HOST],
+                    qemu_id=vm_id,
+                )
+            else:
+                coordinator = ProxmoxLXCCoordinator(
+                    hass=hass,
+                    cluster_coordinator=coordinator_cluster,
+                    host_name=config_entry.data[CONF_HOST],
+                    container_id=vm_id,
+                )
+            coordinator.async_handle_cluster_update()
+            coordinators[vm_id] = coordinator
+            coordinator_cluster.watched_guests.add(int(vm_id))
+            added.append(coordinator)
+    finally:
+        current_entry.reset(token)
+
+    return added
+
+
+@callback
+def async_remove_resource_device(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    api_category: ProxmoxType,
+    resource_id: str | int,
+) -> None:
+    """Remove the device of a resource, and so its entities, from the entry."""
+    dev_reg = dr.async_get(hass)
+    if device := dev_reg.async_get_device(
+        {(DOMAIN, f"{config_entry.entry_id}_{api_category.upper()}_{resource_id}")}
+    ):
+        dev_reg.async_update_device(
+            device_id=device.id,
+            remove_config_entry_id=config_entry.entry_id,
+        )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        for coordinator in entry_data[COORDINATORS].values():
+            coordinator.async_detach()
     return unload_ok
 
 
@@ -534,84 +928,3 @@ def device_info(
         hw_version=None,
         via_device=via_device,
     )
-
-
-class ProxmoxClient:
-    """A wrapper for the proxmoxer ProxmoxAPI client."""
-
-    _proxmox: ProxmoxAPI
-
-    def __init__(
-        self,
-        host: str,
-        user: str,
-        password: str,
-        port: int | None = DEFAULT_PORT,
-        realm: str | None = DEFAULT_REALM,
-        verify_ssl: bool | None = DEFAULT_VERIFY_SSL,
-    ) -> None:
-        """Initialize the ProxmoxClient."""
-
-        self._host = host
-        self._port = port
-        self._user = user
-        self._realm = realm
-        self._password = password
-        self._verify_ssl = verify_ssl
-
-    def build_client(self) -> None:
-        """Construct the ProxmoxAPI client.
-
-        Allows inserting the realm within the `user` value.
-        """
-
-        if "@" in self._user:
-            user_id = self._user
-        else:
-            user_id = f"{self._user}@{self._realm}"
-
-        self._proxmox = ProxmoxAPI(
-            self._host,
-            port=self._port,
-            user=user_id,
-            password=self._password,
-            verify_ssl=self._verify_ssl,
-        )
-
-    def get_api_client(self) -> ProxmoxAPI:
-        """Return the ProxmoxAPI client."""
-        return self._proxmox
-
-
-def call_api_post_status(
-    proxmox: ProxmoxAPI,
-    api_category: ProxmoxType,
-    command: str,
-    node: str,
-    vm_id: int | None = None,
-) -> Any:
-    """Make proper api post status calls to set state."""
-    result = None
-    if command not in ProxmoxCommand:
-        raise ValueError("Invalid Command")
-
-    try:
-        # Only the START_ALL and STOP_ALL are not part of status API
-        if api_category is ProxmoxType.Node and command in [
-            ProxmoxCommand.START_ALL,
-            ProxmoxCommand.STOP_ALL,
-        ]:
-            result = proxmox.nodes(node).post(command)
-        elif api_category is ProxmoxType.Node:
-            result = proxmox(["nodes", node, "status"]).post(command=command)
-        else:
-            result = proxmox(
-                ["nodes", node, api_category, vm_id, "status", command]
-            ).post()
-
-    except (ResourceException, ConnectTimeout) as err:
-        raise ValueError(
-            f"Proxmox {api_category} {command} error - {err}",
-        ) from err
-
-    return result
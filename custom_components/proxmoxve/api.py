@@ -0,0 +1,651 @@
+"""API clients for the Proxmox VE integration."""
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+from aiohttp.hdrs import USER_AGENT
+from proxmoxer import AuthenticationError, ProxmoxAPI
+from proxmoxer.core import ResourceException
+from requests.adapters import HTTPAdapter
+from requests.exceptions import (
+    ConnectionError as connError,
+    ConnectTimeout,
+    SSLError,
+)
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.helpers.json import json_dumps
+from homeassistant.util.ssl import (
+    get_default_context,
+    get_default_no_verify_context,
+)
+
+from .const import (
+    BREAKER_FAILURES,
+    BREAKER_MAX_RETRY_INTERVAL,
+    BREAKER_RETRY_INTERVAL,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_PORT,
+    DEFAULT_REALM,
+    DEFAULT_VERIFY_SSL,
+    LOGGER,
+    ProxmoxCircuitState,
+)
+from .models import ProxmoxPollStats
+
+# Same values used by proxmoxer for the HTTPS backend
+API_TIMEOUT = 5
+TICKET_RENEW_AGE = 3600
+
+# Upper bounds (seconds) of the latency histogram buckets, plus one for slower
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+# Number of recent latencies kept per endpoint for the percentiles
+LATENCY_SAMPLES = 100
+
+# Parts of the API paths naming one guest or task, replaced to get the endpoint
+ENDPOINT_PATTERNS = (
+    (re.compile(r"/(qemu|lxc)/\d+(?=/|$)"), r"/\1/{vmid}"),
+    (re.compile(r"/tasks/[^/]+"), "/tasks/{upid}"),
+)
+
+# Stats of the coordinator update running in the current task, if any
+current_poll: ContextVar[ProxmoxPollStats | None] = ContextVar(
+    "current_poll", default=None
+)
+
+
+@dataclass
+class ProxmoxConnectionStats:
+    """Connection reuse statistics of a ProxmoxClient."""
+
+    requests: int = 0
+    connections_created: int = 0
+
+    @property
+    def connections_reused(self) -> int:
+        """Return the number of requests sent on an already open connection."""
+        return max(self.requests - self.connections_created, 0)
+
+
+@dataclass
+class ProxmoxEndpointStats:
+    """Timing and size of the requests made to one API endpoint."""
+
+    requests: int = 0
+    errors: int = 0
+    bytes_received: int = 0
+    histogram: list[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1)
+    )
+    latencies: deque[float] = field(
+        default_factory=lambda: deque(maxlen=LATENCY_SAMPLES)
+    )
+
+    def record(self, latency: float, size: int, error: bool) -> None:
+        """Record one request."""
+        self.requests += 1
+        self.errors += error
+        self.bytes_received += size
+        self.histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.latencies.append(latency)
+
+
+def endpoint_path(path: str) -> str:
+    """Return the endpoint of an API path, with the guest and task ids replaced.
+
+    The node names are kept, there are few of them and they tell which
+    node fails, while a key per guest or task would grow without bound.
+    """
+    for pattern, replacement in ENDPOINT_PATTERNS:
+        path = pattern.sub(replacement, path)
+    return path
+
+
+class ProxmoxCircuitOpenError(ConnectTimeout):
+    """The request was not sent, the circuit breaker of the endpoint is open.
+
+    It's a ConnectTimeout so the callers handle it like an unreachable host.
+    """
+
+
+@dataclass
+class ProxmoxCircuitBreaker:
+    """Circuit breaker of one API endpoint.
+
+    It opens after BREAKER_FAILURES failed requests in a row. While open,
+    the requests are refused without being sent. Once the retry delay has
+    passed, it's half open and the next request probes the endpoint. The
+    delay starts at BREAKER_RETRY_INTERVAL and doubles with each failed
+    probe, up to BREAKER_MAX_RETRY_INTERVAL.
+    """
+
+    failures: int = 0
+    retry_at: float = 0
+
+    @property
+    def state(self) -> ProxmoxCircuitState:
+        """Return the state of the breaker."""
+        if self.failures < BREAKER_FAILURES:
+            return ProxmoxCircuitState.CLOSED
+        if time.monotonic() < self.retry_at:
+            return ProxmoxCircuitState.OPEN
+        return ProxmoxCircuitState.HALF_OPEN
+
+    def record(self, error: Exception | None) -> None:
+        """Record the outcome of a request."""
+        if not is_endpoint_failure(error):
+            self.failures = 0
+            return
+
+        self.failures += 1
+        if self.failures >= BREAKER_FAILURES:
+            self.retry_at = time.monotonic() + min(
+                BREAKER_RETRY_INTERVAL * 2 ** (self.failures - BREAKER_FAILURES),
+                BREAKER_MAX_RETRY_INTERVAL,
+            )
+
+
+def is_endpoint_failure(error: Exception | None) -> bool:
+    """Return True if the error shows the endpoint can't be used for now.
+
+    Unreachable hosts, server errors and denied permissions count, other
+    API errors mean the endpoint answered.
+    """
+    if isinstance(error, (ConnectTimeout, connError)):
+        return True
+    if isinstance(error, ResourceException):
+        return error.status_code == 403 or error.status_code >= 500
+    return False
+
+
+class ProxmoxAsyncAPI:
+    """Proxmox VE API client running on the event loop with aiohttp.
+
+    Raises the same exceptions as proxmoxer, so the callers don't need to
+    know which transport is in use. With `token_name`, the password is the
+    API token secret and the requests don't need a ticket.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        host: str,
+        port: int | None,
+        user_id: str,
+        password: str,
+        token_name: str | None = None,
+        on_response: Callable[[str, str, float, int, bool], None] | None = None,
+    ) -> None:
+        """Initialize the aiohttp client."""
+
+        self._session = session
+        self._on_response = on_response
+        self._base_url = f"https://{host}:{port}/api2/json"
+        self._user_id = user_id
+        self._password = password
+        self._token_name = token_name
+        self._ticket: str | None = None
+        self._csrf_token: str | None = None
+        self._ticket_birth: float = 0
+        self._login_lock = asyncio.Lock()
+
+    async def async_login(self) -> None:
+        """Get a new authentication ticket, or check the API token."""
+
+        if self._token_name is not None:
+            try:
+                await self._async_send("GET", "version")
+            except ResourceException as error:
+                if error.status_code != 401:
+                    raise
+                raise AuthenticationError(
+                    f"Couldn't authenticate token: {self._user_id}!{self._token_name}"
+                ) from error
+            return
+
+        async with self._login_lock:
+            await self._async_get_ticket()
+
+    async def _async_renew_ticket(self, birth: float) -> None:
+        """Get a new ticket, unless the one born at `birth` was renewed since.
+
+        The requests finding the ticket missing, old or rejected at the same
+        time wait for the login of the first one instead of each logging in.
+        """
+        async with self._login_lock:
+            if self._ticket_birth == birth:
+                await self._async_get_ticket()
+
+    async def _async_get_ticket(self) -> None:
+        """Login with the password, the login lock must be held."""
+        response = await self._async_send(
+            "POST",
+            "access/ticket",
+            data={"username": self._user_id, "password": self._password},
+            authenticate=False,
+        )
+        if response is None:
+            raise AuthenticationError(
+                f"Couldn't authenticate user: {self._user_id} to {self._base_url}/access/ticket"
+            )
+        if response.get("NeedTFA") is not None:
+            raise AuthenticationError(
+                "Couldn't authenticate user: missing Two Factor Authentication (TFA)"
+            )
+
+        self._ticket = response["ticket"]
+        self._csrf_token = response["CSRFPreventionToken"]
+        self._ticket_birth = time.monotonic()
+
+    async def async_get(self, *path: str | int, **params: Any) -> Any:
+        """Make a GET request to the API."""
+        return await self._async_request("GET", path, params=params)
+
+    async def async_post(self, *path: str | int, **data: Any) -> Any:
+        """Make a POST request to the API."""
+        return await self._async_request("POST", path, data=data)
+
+    async def _async_request(
+        self,
+        method: str,
+        path: tuple[str | int, ...],
+        params: dict[str, Any] | None = None,
+        data: dict[str, Any] | None = None,
+    ) -> Any:
+        """Make an authenticated request, renewing the ticket when needed."""
+
+        url_path = "/".join(str(part) for part in path)
+        if self._token_name is not None:
+            return await self._async_send(method, url_path, params=params, data=data)
+
+        birth = self._ticket_birth
+        if self._ticket is None or time.monotonic() - birth >= TICKET_RENEW_AGE:
+            await self._async_renew_ticket(birth)
+            birth = self._ticket_birth
+
+        try:
+            return await self._async_send(method, url_path, params=params, data=data)
+        except ResourceException as error:
+            if error.status_code != 401:
+                raise
+        # The ticket was invalidated on the server side, login once and retry
+        await self._async_renew_ticket(birth)
+        return await self._async_send(method, url_path, params=params, data=data)
+
+    async def _async_send(
+        self,
+        method: str,
+        url_path: str,
+        params: dict[str, Any] | None = None,
+        data: dict[str, Any] | None = None,
+        authenticate: bool = True,
+    ) -> Any:
+        """Send the request and decode the API response."""
+
+        headers = {"Accept": "application/json"}
+        if authenticate and self._token_name is not None:
+            headers[
+                "Authorization"
+            ] = f"PVEAPIToken={self._user_id}!{self._token_name}={self._password}"
+        elif authenticate:
+            headers["Cookie"] = f"PVEAuthCookie={self._ticket}"
+            if method != "GET":
+                headers["CSRFPreventionToken"] = str(self._csrf_token)
+
+        started = time.monotonic()
+        size = 0
+        error = True
+        try:
+            async with self._session.request(
+                method,
+                f"{self._base_url}/{url_path}",
+                params={k: v for k, v in (params or {}).items() if v is not None},
+                data={k: v for k, v in data.items() if v is not None} if data else None,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=API_TIMEOUT),
+            ) as response:
+                if response.status >= 400:
+                    try:
+                        errors = (await response.json()).get("errors")
+                    except (aiohttp.ContentTypeError, ValueError):
+                        errors = None
+                    raise ResourceException(
+                        response.status,
+                        response.reason,
+                        await response.text(),
+                        errors=errors,
+                    )
+                body = await response.read()
+                size = len(body)
+                error = False
+                return json.loads(body)["data"]
+        except aiohttp.ClientSSLError as err:
+            raise SSLError(err) from err
+        except asyncio.TimeoutError as err:
+            raise ConnectTimeout(err) from err
+        except aiohttp.ClientConnectionError as err:
+            raise connError(err) from err
+        finally:
+            if self._on_response is not None:
+                self._on_response(
+                    method, url_path, time.monotonic() - started, size, error
+                )
+
+
+class ProxmoxClient:
+    """A wrapper for the proxmoxer ProxmoxAPI client.
+
+    With `async_client`, the requests made through `async_get` and
+    `async_post` run on the event loop with aiohttp instead of the executor.
+    Both transports keep up to `pool_size` connections open to the host, so
+    the coordinators of a config entry reuse them instead of connecting (and
+    doing a TLS handshake) on every poll.
+
+    With `token_name`, the client authenticates with a PVE API token and
+    `password` holds the token secret. A `user` given as
+    `user@realm!tokenid` is also accepted.
+
+    The latency, size and errors of the requests are recorded per endpoint
+    in `endpoint_stats`, and the time the executor requests waited for a
+    worker thread in `executor_waits`.
+
+    The GET requests go through the circuit breaker of their endpoint, kept
+    in `circuit_breakers`, so a failing node isn't polled on every update.
+    A refused request raises ProxmoxCircuitOpenError. The endpoints are the
+    paths without the guest and task ids, see `endpoint_path`.
+    """
+
+    _proxmox: ProxmoxAPI
+    _adapter: HTTPAdapter | None = None
+    _async_api: ProxmoxAsyncAPI | None = None
+    _session: aiohttp.ClientSession | None = None
+    _unsub_close: CALLBACK_TYPE | None = None
+
+    def __init__(
+        self,
+        host: str,
+        user: str,
+        password: str,
+        port: int | None = DEFAULT_PORT,
+        realm: str | None = DEFAULT_REALM,
+        verify_ssl: bool | None = DEFAULT_VERIFY_SSL,
+        async_client: bool = False,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        token_name: str | None = None,
+    ) -> None:
+        """Initialize the ProxmoxClient."""
+
+        if token_name is None and "!" in user:
+            user, token_name = user.split("!", 1)
+
+        self._host = host
+        self._port = port
+        self._user = user
+        self._token_name = token_name or None
+        self._realm = realm
+        self._password = password
+        self._verify_ssl = verify_ssl
+        self._async_client = async_client
+        self._pool_size = pool_size
+        self._keepalive_timeout = keepalive_timeout
+        self._async_stats = ProxmoxConnectionStats()
+        self._local = threading.local()
+        self.endpoint_stats: dict[str, ProxmoxEndpointStats] = {}
+        self.executor_waits: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.circuit_breakers: dict[str, ProxmoxCircuitBreaker] = {}
+
+    @property
+    def user_id(self) -> str:
+        """Return the user id, allowing the realm within the `user` value."""
+        if "@" in self._user:
+            return self._user
+        return f"{self._user}@{self._realm}"
+
+    def build_client(self) -> None:
+        """Construct the ProxmoxAPI client."""
+
+        if self._token_name is None:
+            self._proxmox = ProxmoxAPI(
+                self._host,
+                port=self._port,
+                user=self.user_id,
+                password=self._password,
+                verify_ssl=self._verify_ssl,
+            )
+        else:
+            self._proxmox = ProxmoxAPI(
+                self._host,
+                port=self._port,
+                user=self.user_id,
+                token_name=self._token_name,
+                token_value=self._password,
+                verify_ssl=self._verify_ssl,
+            )
+        # proxmoxer doesn't expose its requests session, replace its default pool
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_size)
+        self._proxmox._store["session"].mount("https://", self._adapter)
+        self._proxmox._store["session"].hooks["response"].append(self._response_hook)
+
+        if self._token_name is not None:
+            # Unlike the password, the token isn't used until the first request
+            try:
+                self._proxmox.version.get()
+            except ResourceException as error:
+                if error.status_code != 401:
+                    raise
+                raise AuthenticationError(
+                    f"Couldn't authenticate token: {self.user_id}!{self._token_name}"
+                ) from error
+
+    async def async_build_client(self, hass: HomeAssistant) -> None:
+        """Construct the client used by `async_get` and `async_post`.
+
+        The aiohttp client doesn't use the shared session of Home Assistant:
+        its connector keeps idle connections for 15 seconds only, less than
+        the update interval, and has no limit of connections per config
+        entry. The own session is set up like the helpers of Home Assistant
+        do and closed with it.
+        """
+
+        if not self._async_client:
+            await hass.async_add_executor_job(self.build_client)
+            return
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._async_on_connection_create)
+        trace_config.on_request_start.append(self._async_on_request_start)
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=self._pool_size,
+                keepalive_timeout=self._keepalive_timeout,
+                ssl=(
+                    get_default_context()
+                    if self._verify_ssl
+                    else get_default_no_verify_context()
+                ),
+            ),
+            headers={USER_AGENT: SERVER_SOFTWARE},
+            json_serialize=json_dumps,
+            trace_configs=[trace_config],
+        )
+        self._unsub_close = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_CLOSE, self._async_on_hass_close
+        )
+        self._async_api = ProxmoxAsyncAPI(
+            self._session,
+            host=self._host,
+            port=self._port,
+            user_id=self.user_id,
+            password=self._password,
+            token_name=self._token_name,
+            on_response=self._record,
+        )
+        await self._async_api.async_login()
+        LOGGER.debug("Using the aiohttp client for %s:%s", self._host, self._port)
+
+    async def _async_on_connection_create(
+        self,
+        session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceConnectionCreateEndParams,
+    ) -> None:
+        """Count a new connection of the aiohttp client."""
+        self._async_stats.connections_created += 1
+
+    async def _async_on_request_start(
+        self,
+        session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceRequestStartParams,
+    ) -> None:
+        """Count a request of the aiohttp client."""
+        self._async_stats.requests += 1
+
+    async def _async_on_hass_close(self, event: Event) -> None:
+        """Close the aiohttp session when Home Assistant closes."""
+        self._unsub_close = None
+        await self.async_close()
+
+    async def async_close(self) -> None:
+        """Close the connections kept open by the client."""
+        if self._unsub_close is not None:
+            self._unsub_close()
+            self._unsub_close = None
+        if self._session is not None:
+            await self._session.close()
+        elif self._adapter is not None:
+            self._adapter.close()
+
+    @property
+    def connection_stats(self) -> ProxmoxConnectionStats:
+        """Return the connection reuse statistics of the client."""
+        if self._async_client:
+            return self._async_stats
+
+        stats = ProxmoxConnectionStats()
+        if self._adapter is not None:
+            pools = self._adapter.poolmanager.pools
+            for key in pools.keys():
+                if (pool := pools.get(key)) is not None:
+                    stats.requests += pool.num_requests
+                    stats.connections_created += pool.num_connections
+        return stats
+
+    def get_api_client(self) -> ProxmoxAPI:
+        """Return the ProxmoxAPI client."""
+        return self._proxmox
+
+    async def async_get(self, *path: str | int, **params: Any) -> Any:
+        """Make a GET request to the API path, unless its circuit is open."""
+        url_path = "/".join(str(part) for part in path)
+        endpoint = endpoint_path(url_path)
+        breaker = self.circuit_breakers.get(endpoint)
+        if breaker is not None and breaker.state == ProxmoxCircuitState.OPEN:
+            raise ProxmoxCircuitOpenError(
+                f"Circuit breaker open for {endpoint} after {breaker.failures} "
+                f"failures, next try in {breaker.retry_at - time.monotonic():.0f}s"
+            )
+
+        try:
+            if self._async_api is not None:
+                result = await self._async_api.async_get(*path, **params)
+            else:
+                result = await self._async_executor_request("GET", path, params)
+        except Exception as error:
+            if is_endpoint_failure(error):
+                if breaker is None:
+                    breaker = self.circuit_breakers[endpoint] = ProxmoxCircuitBreaker()
+                breaker.record(error)
+                if breaker.state == ProxmoxCircuitState.OPEN:
+                    LOGGER.debug("Circuit breaker opened for %s: %s", endpoint, error)
+            else:
+                self.circuit_breakers.pop(endpoint, None)
+            raise
+        # Only the breakers of the failing endpoints are kept
+        self.circuit_breakers.pop(endpoint, None)
+        return result
+
+    def circuit_state(self, path_prefix: str = "") -> ProxmoxCircuitState:
+        """Return the worst state of the circuit breakers under the path prefix."""
+        states = {
+            breaker.state
+            for path, breaker in self.circuit_breakers.items()
+            if path.startswith(path_prefix)
+        }
+        for state in (ProxmoxCircuitState.OPEN, ProxmoxCircuitState.HALF_OPEN):
+            if state in states:
+                return state
+        return ProxmoxCircuitState.CLOSED
+
+    async def async_post(self, *path: str | int, **data: Any) -> Any:
+        """Make a POST request to the API path."""
+        if self._async_api is not None:
+            return await self._async_api.async_post(*path, **data)
+        return await self._async_executor_request("POST", path, data)
+
+    async def _async_executor_request(
+        self, method: str, path: tuple[str | int, ...], data: dict[str, Any]
+    ) -> Any:
+        """Make a request with proxmoxer in the executor and record it."""
+        submitted = time.monotonic()
+        started: float | None = None
+        size = 0
+
+        def request() -> Any:
+            nonlocal started, size
+            started = time.monotonic()
+            self._local.size = 0
+            try:
+                return getattr(self._proxmox(list(path)), method.lower())(**data)
+            finally:
+                size = self._local.size
+
+        error = True
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(None, request)
+            error = False
+            return result
+        finally:
+            if started is not None:
+                self.executor_waits.append(started - submitted)
+                self._record(
+                    method,
+                    "/".join(str(part) for part in path),
+                    time.monotonic() - started,
+                    size,
+                    error,
+                )
+
+    def _response_hook(self, response: Any, *args: Any, **kwargs: Any) -> None:
+        """Keep the size of the last response of the executor thread."""
+        self._local.size = len(response.content)
+
+    @callback
+    def _record(
+        self, method: str, path: str, latency: float, size: int, error: bool
+    ) -> None:
+        """Record a request in the endpoint and current poll stats."""
+        key = f"{method} {endpoint_path(path)}"
+        if (stats := self.endpoint_stats.get(key)) is None:
+            stats = self.endpoint_stats[key] = ProxmoxEndpointStats()
+        stats.record(latency, size, error)
+
+        if (poll := current_poll.get()) is not None:
+            poll.requests += 1
+            poll.bytes_received += size
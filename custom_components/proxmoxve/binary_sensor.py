@@ -10,13 +10,15 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from . import COORDINATORS, DOMAIN, device_info
-from .const import CONF_LXC, CONF_NODES, CONF_QEMU, ProxmoxKeyAPIParse, ProxmoxType
+from .const import SIGNAL_RESOURCES_ADDED, ProxmoxKeyAPIParse, ProxmoxType
+from .coordinator import ProxmoxCoordinator, ProxmoxNodeCoordinator
 from .entity import ProxmoxEntity
 from .models import ProxmoxEntityDescription
 
@@ -66,74 +68,59 @@ async def async_setup_entry(
 ) -> None:
     """Set up binary sensors."""
 
-    sensors = []
     coordinators = hass.data[DOMAIN][config_entry.entry_id][COORDINATORS]
 
-    for node in config_entry.data[CONF_NODES]:
-        coordinator = coordinators[node]
-        # unfound node case
-        if coordinator.data is not None:
-            for description in PROXMOX_BINARYSENSOR_NODES:
-                sensors.append(
-                    create_binary_sensor(
-                        coordinator=coordinator,
-                        config_entry=config_entry,
-                        info_device=device_info(
-                            hass=hass,
+    @callback
+    def async_add_resources(resource_coordinators: list[ProxmoxCoordinator]) -> None:
+        """Add the binary sensors of the nodes and guests."""
+        sensors = []
+        for coordinator in resource_coordinators:
+            # unfound resource case
+            if coordinator.data is None:
+                continue
+            if isinstance(coordinator, ProxmoxNodeCoordinator):
+                for description in PROXMOX_BINARYSENSOR_NODES:
+                    sensors.append(
+                        create_binary_sensor(
+                            coordinator=coordinator,
                             config_entry=config_entry,
-                            api_category=ProxmoxType.Node,
-                            node=node,
-                        ),
-                        description=description,
-                        vm_id=None,
+                            info_device=device_info(
+                                hass=hass,
+                                config_entry=config_entry,
+                                api_category=ProxmoxType.Node,
+                                node=coordinator.node_name,
+                            ),
+                            description=description,
+                            vm_id=coordinator.node_name,
+                        )
                     )
-                )
-
-    for vm_id in config_entry.data[CONF_QEMU]:
-        coordinator = coordinators[vm_id]
-        # unfound vm case
-        if coordinator.data is None:
-            continue
-        for description in PROXMOX_BINARYSENSOR_VM:
-            if description.api_category in (None, ProxmoxType.QEMU):
-                sensors.append(
-                    create_binary_sensor(
-                        coordinator=coordinator,
-                        config_entry=config_entry,
-                        info_device=device_info(
-                            hass=hass,
+                continue
+            for description in PROXMOX_BINARYSENSOR_VM:
+                if description.api_category in (None, coordinator.api_category):
+                    sensors.append(
+                        create_binary_sensor(
+                            coordinator=coordinator,
                             config_entry=config_entry,
-                            api_category=ProxmoxType.QEMU,
-                            vm_id=vm_id,
-                        ),
-                        description=description,
-                        vm_id=vm_id,
+                            info_device=device_info(
+                                hass=hass,
+                                config_entry=config_entry,
+                                api_category=coordinator.api_category,
+                                vm_id=coordinator.vm_id,
+                            ),
+                            description=description,
+                            vm_id=coordinator.vm_id,
+                        )
                     )
-                )
-
-    for container_id in config_entry.data[CONF_LXC]:
-        coordinator = coordinators[container_id]
-        # unfound container case
-        if coordinator.data is None:
-            continue
-        for description in PROXMOX_BINARYSENSOR_VM:
-            if description.api_category in (None, ProxmoxType.LXC):
-                sensors.append(
-                    create_binary_sensor(
-                        coordinator=coordinator,
-                        config_entry=config_entry,
-                        info_device=device_info(
-                            hass=hass,
-                            config_entry=config_entry,
-                            api_category=ProxmoxType.LXC,
-                            vm_id=container_id,
-                        ),
-                        description=description,
-                        vm_id=container_id,
-                    )
-                )
-
-    async_add_entities(sensors)
+        async_add_entities(sensors)
+
+    async_add_resources(list(coordinators.values()))
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_RESOURCES_ADDED.format(config_entry.entry_id),
+            async_add_resources,
+        )
+    )
 
 
 def create_binary_sensor(
@@ -170,12 +157,15 @@ class ProxmoxBinarySensorEntity(ProxmoxEntity, BinarySensorEntity):
         self._attr_device_info = info_device
 
     @property
-    def is_on(self) -> bool:
+    def is_on(self) -> bool | None:
         """Return the state of the binary sensor."""
         if (data := self.coordinator.data) is None:
             return False
 
-        if not getattr(data, self.entity_description.key):
+        if (value := getattr(data, self.entity_description.key)) is None:
+            return None
+
+        if not value:
             return False
 
         if self.entity_description.inverted:
@@ -6,28 +6,24 @@ from typing import Final
 
 from homeassistant.components.button import ButtonEntity, ButtonEntityDescription
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from . import (
-    ProxmoxClient,
-    call_api_post_status,
-    device_info,
-)
+from . import device_info
+from .commands import ProxmoxCommandQueue
 from .const import (
-    CONF_LXC,
-    CONF_NODE,
-    CONF_NODES,
-    CONF_QEMU,
+    COMMAND_QUEUE,
     COORDINATORS,
     DOMAIN,
     LOGGER,
-    PROXMOX_CLIENT,
+    SIGNAL_RESOURCES_ADDED,
     ProxmoxCommand,
     ProxmoxType,
 )
+from .coordinator import ProxmoxCoordinator, ProxmoxNodeCoordinator
 from .entity import ProxmoxEntity
 from .models import ProxmoxEntityDescription
 
@@ -37,6 +33,7 @@ class ProxmoxButtonEntityDescription(ProxmoxEntityDescription, ButtonEntityDescr
     """Class describing Proxmox buttons entities."""
 
     api_category: ProxmoxType | None = None  # Set when the sensor applies to only QEMU or LXC, if None applies to both.
+    stale_max_age: int = 0  # The commands aren't offered while the updates fail
 
 
 PROXMOX_BUTTON_NODE: Final[tuple[ProxmoxButtonEntityDescription, ...]] = (
@@ -126,89 +123,71 @@ async def async_setup_entry(
 ) -> None:
     """Set up button."""
 
-    buttons = []
-
     coordinators = hass.data[DOMAIN][config_entry.entry_id][COORDINATORS]
-    proxmox_client = hass.data[DOMAIN][config_entry.entry_id][PROXMOX_CLIENT]
+    command_queue = hass.data[DOMAIN][config_entry.entry_id][COMMAND_QUEUE]
 
-    for node in config_entry.data[CONF_NODES]:
-        coordinator = coordinators[node]
-        # unfound vm case
-        if coordinator.data is not None:
-            for description in PROXMOX_BUTTON_NODE:
-                buttons.append(
-                    create_button(
-                        coordinator=coordinator,
-                        info_device=device_info(
-                            hass=hass,
-                            config_entry=config_entry,
+    @callback
+    def async_add_resources(resource_coordinators: list[ProxmoxCoordinator]) -> None:
+        """Add the buttons of the nodes and guests."""
+        buttons = []
+        for coordinator in resource_coordinators:
+            # unfound resource case
+            if coordinator.data is None:
+                continue
+            if isinstance(coordinator, ProxmoxNodeCoordinator):
+                for description in PROXMOX_BUTTON_NODE:
+                    buttons.append(
+                        create_button(
+                            coordinator=coordinator,
+                            info_device=device_info(
+                                hass=hass,
+                                config_entry=config_entry,
+                                api_category=ProxmoxType.Node,
+                                node=coordinator.node_name,
+                            ),
+                            description=description,
+                            resource_id=coordinator.node_name,
+                            command_queue=command_queue,
                             api_category=ProxmoxType.Node,
-                            node=node,
-                        ),
-                        description=description,
-                        resource_id=node,
-                        proxmox_client=proxmox_client,
-                        api_category=ProxmoxType.Node,
-                        config_entry=config_entry,
-                    )
-                )
-
-    for vm_id in config_entry.data[CONF_QEMU]:
-        coordinator = coordinators[vm_id]
-        # unfound vm case
-        if coordinator.data is None:
-            continue
-        for description in PROXMOX_BUTTON_VM:
-            if ProxmoxType.QEMU in description.api_category:
-                buttons.append(
-                    create_button(
-                        coordinator=coordinator,
-                        info_device=device_info(
-                            hass=hass,
                             config_entry=config_entry,
-                            api_category=ProxmoxType.QEMU,
-                            vm_id=vm_id,
-                        ),
-                        description=description,
-                        resource_id=vm_id,
-                        proxmox_client=proxmox_client,
-                        api_category=ProxmoxType.QEMU,
-                        config_entry=config_entry,
+                        )
                     )
-                )
-
-    for ct_id in config_entry.data[CONF_LXC]:
-        coordinator = coordinators[ct_id]
-        # unfound container case
-        if coordinator.data is None:
-            continue
-        for description in PROXMOX_BUTTON_VM:
-            if ProxmoxType.LXC in description.api_category:
-                buttons.append(
-                    create_button(
-                        coordinator=coordinator,
-                        info_device=device_info(
-                            hass=hass,
+                continue
+            for description in PROXMOX_BUTTON_VM:
+                if coordinator.api_category in description.api_category:
+                    buttons.append(
+                        create_button(
+                            coordinator=coordinator,
+                            info_device=device_info(
+                                hass=hass,
+                                config_entry=config_entry,
+                                api_category=coordinator.api_category,
+                                vm_id=coordinator.vm_id,
+                            ),
+                            description=description,
+                            resource_id=coordinator.vm_id,
+                            command_queue=command_queue,
+                            api_category=coordinator.api_category,
                             config_entry=config_entry,
-                            api_category=ProxmoxType.LXC,
-                            vm_id=ct_id,
-                        ),
-                        description=description,
-                        resource_id=ct_id,
-                        proxmox_client=proxmox_client,
-                        api_category=ProxmoxType.LXC,
-                        config_entry=config_entry,
+                        )
                     )
-                )
+        async_add_entities(buttons)
 
-    async_add_entities(buttons)
+    async_add_resources(list(coordinators.values()))
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_RESOURCES_ADDED.format(config_entry.entry_id),
+            async_add_resources,
+        )
+    )
 
 
 def create_button(
     coordinator: DataUpdateCoordinator,
     info_device: DeviceInfo,
     description: ProxmoxButtonEntityDescription,
-    proxmox_client: ProxmoxClient,
+    command_queue: ProxmoxCommandQueue,
     api_category: ProxmoxType,
     resource_id: str | int,
     config_entry: ConfigEntry,
@@ -216,7 +195,7 @@ def create_button(
     """Create a button based on the given data."""
     return ProxmoxButtonEntity(
         description=description,
-        proxmox_client=proxmox_client,
+        command_queue=command_queue,
         api_category=api_category,
         coordinator=coordinator,
         unique_id=f"{config_entry.entry_id}_{resource_id}_{description.key}",
@@ -237,7 +216,7 @@ class ProxmoxButtonEntity(ProxmoxEntity, ButtonEntity):
         info_device: DeviceInfo,
         description: ProxmoxButtonEntityDescription,
         unique_id: str,
-        proxmox_client: ProxmoxClient,
+        command_queue: ProxmoxCommandQueue,
         api_category: ProxmoxType,
         resource_id: str | int,
         config_entry: ConfigEntry,
@@ -247,7 +226,7 @@ class ProxmoxButtonEntity(ProxmoxEntity, ButtonEntity):
 
         self._attr_device_info = info_device
 
-        def _button_press():
+        async def _async_button_press():
             """Post start command & tell HA state is on."""
 
             if api_category == ProxmoxType.Node:
@@ -259,13 +238,22 @@ class ProxmoxButtonEntity(ProxmoxEntity, ButtonEntity):
                 node = data.node
                 vm_id = resource_id
 
-            call_api_post_status(
-                proxmox=proxmox_client.get_api_client(),
+            if not await command_queue.async_send(
+                coordinator=self.coordinator,
                 node=node,
                 vm_id=vm_id,
                 api_category=api_category,
                 command=description.key,
-            )
+            ):
+                # The same command is already on its way
+                return None
+            if api_category == ProxmoxType.Node and description.key in (
+                ProxmoxCommand.REBOOT,
+                ProxmoxCommand.SHUTDOWN,
+            ):
+                # The node may come back with a different version
+                self.coordinator.invalidate_version()
+            await self.coordinator.async_boost()
 
             LOGGER.debug(
                 "Button press: %s - %s - %s - %s",
@@ -275,13 +263,13 @@ class ProxmoxButtonEntity(ProxmoxEntity, ButtonEntity):
                 description.key,
             )
 
-        self._button_press_funct = _button_press
+        self._async_button_press_funct = _async_button_press
 
     @property
     def available(self) -> bool:
         """Return sensor availability."""
         return super().available and self.coordinator.data is not None
 
-    def press(self) -> None:
+    async def async_press(self) -> None:
         """Press the button."""
-        self._button_press_funct()
+        await self._async_button_press_funct()
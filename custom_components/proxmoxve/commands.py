@@ -0,0 +1,359 @@
+"""Commands sent to the Proxmox VE nodes and guests."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Sequence
+import re
+from time import monotonic
+from typing import Any
+
+from proxmoxer.core import ResourceException
+from requests.exceptions import ConnectionError as connError, ConnectTimeout
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util.async_ import gather_with_concurrency
+
+from .api import ProxmoxClient
+from .const import (
+    ATTR_COMMAND,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_TAGS,
+    ATTR_VMIDS,
+    CLUSTER_COORDINATOR,
+    COMMAND_QUEUE,
+    CONF_MAX_CONCURRENT_REFRESH,
+    DEFAULT_MAX_CONCURRENT_REFRESH,
+    DOMAIN,
+    LOGGER,
+    TASK_POLL_INTERVAL,
+    TASK_TIMEOUT,
+    ProxmoxCommand,
+    ProxmoxType,
+)
+from .coordinator import ProxmoxClusterCoordinator, ProxmoxCoordinator
+
+# Guest commands of the bulk command service, with the guest types they apply to
+BULK_COMMANDS: dict[ProxmoxCommand, tuple[ProxmoxType, ...]] = {
+    ProxmoxCommand.START: (ProxmoxType.QEMU, ProxmoxType.LXC),
+    ProxmoxCommand.SHUTDOWN: (ProxmoxType.QEMU, ProxmoxType.LXC),
+    ProxmoxCommand.STOP: (ProxmoxType.QEMU, ProxmoxType.LXC),
+    ProxmoxCommand.REBOOT: (ProxmoxType.QEMU, ProxmoxType.LXC),
+    ProxmoxCommand.SUSPEND: (ProxmoxType.QEMU,),
+    ProxmoxCommand.RESUME: (ProxmoxType.QEMU,),
+    ProxmoxCommand.RESET: (ProxmoxType.QEMU,),
+}
+# Node commands doing a guest command for a list of guests in one task
+NODE_BULK_COMMANDS: dict[ProxmoxCommand, ProxmoxCommand] = {
+    ProxmoxCommand.START: ProxmoxCommand.START_ALL,
+    ProxmoxCommand.SHUTDOWN: ProxmoxCommand.STOP_ALL,
+}
+
+BULK_COMMAND_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(ATTR_COMMAND): vol.In(
+                [str(command) for command in BULK_COMMANDS]
+            ),
+            vol.Optional(ATTR_VMIDS): vol.All(cv.ensure_list, [cv.positive_int]),
+            vol.Optional(ATTR_TAGS): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_VMIDS, ATTR_TAGS),
+)
+
+# The tags of a guest are separated by semicolons, older versions also allowed commas
+TAGS_SEPARATOR = re.compile(r"[;,\s]+")
+
+
+class ProxmoxCommandQueue:
+    """Queue of the commands sent to the nodes of a config entry.
+
+    The commands of a node are sent one at a time, in the order they were
+    queued. A command isn't sent again while the same command for the same
+    resource is queued or its task is running, it's coalesced with it.
+
+    The API answers a command with the UPID of the task it started. The task
+    status is followed until it stops, then the coordinator of the resource
+    is refreshed so the result shows up without waiting for the next poll.
+    """
+
+    def __init__(self, hass: HomeAssistant, proxmox_client: ProxmoxClient) -> None:
+        """Initialize the command queue."""
+        self.hass = hass
+        self.proxmox_client = proxmox_client
+        self._node_locks: dict[str, asyncio.Lock] = {}
+        self._pending: set[
+            tuple[str, ProxmoxType, int | None, str, tuple[int, ...]]
+        ] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def async_send(
+        self,
+        coordinator: ProxmoxCoordinator | ProxmoxClusterCoordinator,
+        api_category: ProxmoxType,
+        command: str,
+        node: str,
+        vm_id: int | None = None,
+        vm_ids: Sequence[int] | None = None,
+    ) -> bool:
+        """Queue a command and wait until it's sent.
+
+        Return False if it was coalesced with the same pending command.
+        """
+        key = (node, api_category, vm_id, command, tuple(vm_ids or ()))
+        if key in self._pending:
+            LOGGER.debug(
+                "Command %s of %s %s already pending, not sent again",
+                command,
+                api_category,
+                node if vm_id is None else vm_id,
+            )
+            return False
+
+        self._pending.add(key)
+        try:
+            async with self._node_locks.setdefault(node, asyncio.Lock()):
+                upid = await async_call_api_post_status(
+                    proxmox_client=self.proxmox_client,
+                    api_category=api_category,
+                    command=command,
+                    node=node,
+                    vm_id=vm_id,
+                    vm_ids=vm_ids,
+                )
+        except BaseException:
+            self._pending.discard(key)
+            raise
+
+        task = self.hass.async_create_task(
+            self._async_follow_task(key, upid, coordinator)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    @callback
+    def async_cancel(self) -> None:
+        """Stop following the tasks, the config entry is unloaded."""
+        for task in self._tasks:
+            task.cancel()
+
+    async def _async_follow_task(
+        self,
+        key: tuple[str, ProxmoxType, int | None, str, tuple[int, ...]],
+        upid: Any,
+        coordinator: ProxmoxCoordinator | ProxmoxClusterCoordinator,
+    ) -> None:
+        """Wait for the task of a command to stop, then refresh the resource."""
+        try:
+            if isinstance(upid, str) and upid.startswith("UPID:"):
+                await self._async_wait_task(key[0], upid)
+        finally:
+            self._pending.discard(key)
+        await coordinator.async_command_completed()
+
+    async def _async_wait_task(self, node: str, upid: str) -> None:
+        """Poll the status of a task until it stops or TASK_TIMEOUT."""
+        deadline = monotonic() + TASK_TIMEOUT
+        while monotonic() < deadline:
+            await asyncio.sleep(TASK_POLL_INTERVAL)
+            try:
+                status = await self.proxmox_client.async_get(
+                    "nodes", node, "tasks", upid, "status"
+                )
+            except (ResourceException, ConnectTimeout, connError) as error:
+                LOGGER.debug("Unable to follow the task %s: %s", upid, error)
+                return
+
+            if status.get("status") == "running":
+                continue
+            if (exit_status := status.get("exitstatus")) != "OK":
+                LOGGER.warning("Task %s failed: %s", upid, exit_status)
+            return
+
+        LOGGER.debug("Task %s still running after %ss", upid, TASK_TIMEOUT)
+
+
+async def async_call_api_post_status(
+    proxmox_client: ProxmoxClient,
+    api_category: ProxmoxType,
+    command: str,
+    node: str,
+    vm_id: int | None = None,
+    vm_ids: Sequence[int] | None = None,
+) -> Any:
+    """Make proper api post status calls to set state.
+
+    `vm_ids` limits the START_ALL and STOP_ALL commands to these guests.
+    """
+    result = None
+    if command not in ProxmoxCommand:
+        raise ValueError("Invalid Command")
+
+    try:
+        # Only the START_ALL and STOP_ALL are not part of status API
+        if api_category is ProxmoxType.Node and command in [
+            ProxmoxCommand.START_ALL,
+            ProxmoxCommand.STOP_ALL,
+        ]:
+            params: dict[str, Any] = {}
+            if vm_ids:
+                params["vms"] = ",".join(str(vm_id) for vm_id in vm_ids)
+                # Otherwise startall skips the guests not started on boot
+                if command == ProxmoxCommand.START_ALL:
+                    params["force"] = 1
+            result = await proxmox_client.async_post("nodes", node, command, **params)
+        elif api_category is ProxmoxType.Node:
+            result = await proxmox_client.async_post(
+                "nodes", node, "status", command=command
+            )
+        else:
+            result = await proxmox_client.async_post(
+                "nodes", node, api_category, vm_id, "status", command
+            )
+
+    except (ResourceException, ConnectTimeout) as err:
+        raise ValueError(
+            f"Proxmox {api_category} {command} error - {err}",
+        ) from err
+
+    return result
+
+
+async def async_handle_bulk_command(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Send a command to the guests selected by id or tag.
+
+    Without a config entry id, the guests are looked up in the cluster of
+    every loaded config entry. A vmid matching no guest fails the call before
+    any command is sent.
+    """
+    command = ProxmoxCommand(call.data[ATTR_COMMAND])
+    vm_ids = set(call.data.get(ATTR_VMIDS, []))
+    tags = set(call.data.get(ATTR_TAGS, []))
+
+    if (entry_id := call.data.get(ATTR_CONFIG_ENTRY_ID)) is not None:
+        if entry_id not in hass.data.get(DOMAIN, {}):
+            raise HomeAssistantError(
+                f"Proxmox VE config entry {entry_id} is not loaded"
+            )
+        entry_ids = [entry_id]
+    else:
+        entry_ids = list(hass.data.get(DOMAIN, {}))
+
+    selections = {
+        entry_id: async_select_bulk_guests(hass, entry_id, command, vm_ids, tags)
+        for entry_id in entry_ids
+    }
+    selected = {
+        guest["vmid"]
+        for node_guests in selections.values()
+        for guests in node_guests.values()
+        for guest in guests
+    }
+    if unknown := vm_ids - selected:
+        raise HomeAssistantError(
+            f"No guest supporting {command} found for the vmids: "
+            f"{', '.join(str(vm_id) for vm_id in sorted(unknown))}"
+        )
+
+    for entry_id, node_guests in selections.items():
+        await async_bulk_command(hass, entry_id, command, node_guests)
+
+
+@callback
+def async_select_bulk_guests(
+    hass: HomeAssistant,
+    entry_id: str,
+    command: ProxmoxCommand,
+    vm_ids: set[int],
+    tags: set[str],
+) -> dict[str, list[dict[str, Any]]]:
+    """Return the guests of a cluster selected by id or tag, by node.
+
+    Templates and guests of a type the command doesn't apply to are left out.
+    """
+    config_entry = hass.config_entries.async_get_entry(entry_id)
+    cluster_coordinator: ProxmoxClusterCoordinator = hass.data[DOMAIN][entry_id][
+        CLUSTER_COORDINATOR
+    ]
+    if (cluster_data := cluster_coordinator.data) is None:
+        raise HomeAssistantError(
+            f"The cluster resources of {config_entry.title} are unavailable"
+        )
+
+    node_guests: dict[str, list[dict[str, Any]]] = {}
+    for guest in cluster_data.guests.values():
+        if guest.get("template") or guest.get("type") not in BULK_COMMANDS[command]:
+            continue
+        if guest["vmid"] not in vm_ids and not tags.intersection(
+            TAGS_SEPARATOR.split(guest.get("tags", ""))
+        ):
+            continue
+        node_guests.setdefault(guest["node"], []).append(guest)
+    return node_guests
+
+
+async def async_bulk_command(
+    hass: HomeAssistant,
+    entry_id: str,
+    command: ProxmoxCommand,
+    node_guests: dict[str, list[dict[str, Any]]],
+) -> None:
+    """Send a command to the selected guests of a cluster, grouped by node.
+
+    The START and SHUTDOWN commands are sent as one startall or stopall
+    task per node, limited to the selected guests. The other commands are
+    sent per guest. The command queue sends the commands of a node one at a
+    time, so only the guests of different nodes are handled in parallel, up
+    to the max concurrent refresh of the config entry.
+    """
+    entry_data = hass.data[DOMAIN][entry_id]
+    config_entry = hass.config_entries.async_get_entry(entry_id)
+    cluster_coordinator: ProxmoxClusterCoordinator = entry_data[CLUSTER_COORDINATOR]
+    command_queue: ProxmoxCommandQueue = entry_data[COMMAND_QUEUE]
+
+    if not node_guests:
+        LOGGER.debug("No guest of %s selected for %s", config_entry.title, command)
+        return
+
+    sends = []
+    for node, guests in node_guests.items():
+        if (node_command := NODE_BULK_COMMANDS.get(command)) is not None:
+            sends.append(
+                command_queue.async_send(
+                    coordinator=cluster_coordinator,
+                    api_category=ProxmoxType.Node,
+                    command=node_command,
+                    node=node,
+                    vm_ids=sorted(guest["vmid"] for guest in guests),
+                )
+            )
+            continue
+        sends.extend(
+            command_queue.async_send(
+                coordinator=cluster_coordinator,
+                api_category=ProxmoxType(guest["type"]),
+                command=command,
+                node=node,
+                vm_id=guest["vmid"],
+            )
+            for guest in guests
+        )
+
+    results = await gather_with_concurrency(
+        config_entry.data.get(
+            CONF_MAX_CONCURRENT_REFRESH, DEFAULT_MAX_CONCURRENT_REFRESH
+        ),
+        *sends,
+        return_exceptions=True,
+    )
+    await cluster_coordinator.async_boost()
+
+    if errors := [result for result in results if isinstance(result, Exception)]:
+        raise HomeAssistantError(
+            f"{len(errors)} of {len(results)} {command} commands failed: {errors[0]}"
+        )
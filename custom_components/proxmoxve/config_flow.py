@@ -27,22 +27,39 @@ from homeassistant.helpers.issue_registry import (
     async_delete_issue,
 )
 
-from . import ProxmoxClient, ProxmoxType
+from . import ProxmoxClient, ProxmoxType, async_update_exposed_resources
 from .const import (
+    CONF_ALL_GUESTS,
+    CONF_ASYNC_CLIENT,
     CONF_CONTAINERS,
+    CONF_KEEPALIVE_TIMEOUT,
     CONF_LXC,
+    CONF_MAX_CONCURRENT_REFRESH,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
     CONF_NODE,
     CONF_NODES,
+    CONF_POOL_SIZE,
     CONF_QEMU,
     CONF_REALM,
+    CONF_TOKEN_NAME,
     CONF_VMS,
+    COORDINATORS,
+    DEFAULT_ALL_GUESTS,
+    DEFAULT_ASYNC_CLIENT,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_MAX_CONCURRENT_REFRESH,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_POOL_SIZE,
     DEFAULT_PORT,
     DEFAULT_REALM,
     DEFAULT_VERIFY_SSL,
     DOMAIN,
     LOGGER,
+    UPDATE_INTERVAL,
     VERSION_REMOVE_YAML,
 )
+from .coordinator import ProxmoxLXCCoordinator, ProxmoxQEMUCoordinator
 
 SCHEMA_HOST_BASE: vol.Schema = vol.Schema(
     {
@@ -60,11 +77,32 @@ SCHEMA_HOST_AUTH: vol.Schema = vol.Schema(
         vol.Required(CONF_USERNAME): str,
         vol.Required(CONF_PASSWORD): str,
         vol.Optional(CONF_REALM, default=DEFAULT_REALM): str,
+        vol.Optional(CONF_TOKEN_NAME): str,
     }
 )
 SCHEMA_HOST_FULL: vol.Schema = SCHEMA_HOST_BASE.extend(SCHEMA_HOST_SSL.schema).extend(
     SCHEMA_HOST_AUTH.schema
 )
+SCHEMA_ADVANCED: vol.Schema = vol.Schema(
+    {
+        vol.Optional(CONF_MIN_UPDATE_INTERVAL, default=UPDATE_INTERVAL): vol.All(
+            vol.Coerce(int), vol.Range(min=5, max=3600)
+        ),
+        vol.Optional(
+            CONF_MAX_UPDATE_INTERVAL, default=DEFAULT_MAX_UPDATE_INTERVAL
+        ): vol.All(vol.Coerce(int), vol.Range(min=5, max=86400)),
+        vol.Optional(CONF_ASYNC_CLIENT, default=DEFAULT_ASYNC_CLIENT): bool,
+        vol.Optional(
+            CONF_MAX_CONCURRENT_REFRESH, default=DEFAULT_MAX_CONCURRENT_REFRESH
+        ): vol.All(vol.Coerce(int), vol.Range(min=1, max=50)),
+        vol.Optional(CONF_POOL_SIZE, default=DEFAULT_POOL_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+        vol.Optional(
+            CONF_KEEPALIVE_TIMEOUT, default=DEFAULT_KEEPALIVE_TIMEOUT
+        ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+    }
+)
 
 
 class ProxmoxOptionsFlowHandler(config_entries.OptionsFlow):
@@ -84,6 +122,7 @@ class ProxmoxOptionsFlowHandler(config_entries.OptionsFlow):
             menu_options=[
                 "host_auth",
                 "change_expose",
+                "advanced",
             ],
         )
 
@@ -97,6 +136,7 @@ class ProxmoxOptionsFlowHandler(config_entries.OptionsFlow):
             user: str = str(user_input.get(CONF_USERNAME))
             realm: str = str(user_input.get(CONF_REALM))
             password: str = str(user_input.get(CONF_PASSWORD))
+            token_name: str | None = user_input.get(CONF_TOKEN_NAME)
             verify_ssl = user_input.get(CONF_VERIFY_SSL)
 
             try:
@@ -107,6 +147,7 @@ class ProxmoxOptionsFlowHandler(config_entries.OptionsFlow):
                     realm=realm,
                     password=password,
                     verify_ssl=verify_ssl,
+                    token_name=token_name,
                 )
 
                 await self.hass.async_add_executor_job(
@@ -131,6 +172,7 @@ class ProxmoxOptionsFlowHandler(config_entries.OptionsFlow):
                 config_data[CONF_USERNAME] = user_input.get(CONF_USERNAME)
                 config_data[CONF_PASSWORD] = user_input.get(CONF_PASSWORD)
                 config_data[CONF_REALM] = user_input.get(CONF_REALM)
+                config_data[CONF_TOKEN_NAME] = user_input.get(CONF_TOKEN_NAME)
                 config_data[CONF_VERIFY_SSL] = user_input.get(CONF_VERIFY_SSL)
 
                 self.hass.config_entries.async_update_entry(
@@ -149,6 +191,43 @@ class ProxmoxOptionsFlowHandler(config_entries.OptionsFlow):
             errors=errors,
         )
 
+    async def async_step_advanced(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the polling and connection options."""
+        errors = {}
+
+        if user_input is not None and user_input.get(
+            CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+        ) < user_input.get(CONF_MIN_UPDATE_INTERVAL, UPDATE_INTERVAL):
+            errors[CONF_MAX_UPDATE_INTERVAL] = "invalid_update_interval"
+
+        elif user_input is not None:
+            config_data: dict[str, Any] = (
+                self.config_entry.data.copy()
+                if self.config_entry.data is not None
+                else {}
+            )
+            config_data.update(user_input)
+
+            self.hass.config_entries.async_update_entry(
+                self.config_entry,
+                data=config_data,
+            )
+
+            await self.hass.config_entries.async_reload(self.config_entry.entry_id)
+
+            return self.async_abort(reason="changes_successful")
+
+        return self.async_show_form(
+            step_id="advanced",
+            data_schema=self.add_suggested_values_to_schema(
+                SCHEMA_ADVANCED,
+                user_input or self.config_entry.data,
+            ),
+            errors=errors,
+        )
+
     async def async_step_change_expose(
         self,
         user_input: dict[str, Any] | None = None,
@@ -178,6 +257,7 @@ class ProxmoxOptionsFlowHandler(config_entries.OptionsFlow):
             user = self.config_entry.data[CONF_USERNAME]
             realm = self.config_entry.data[CONF_REALM]
             password = self.config_entry.data[CONF_PASSWORD]
+            token_name = self.config_entry.data.get(CONF_TOKEN_NAME)
             verify_ssl = self.config_entry.data[CONF_VERIFY_SSL]
 
             try:
@@ -188,6 +268,7 @@ class ProxmoxOptionsFlowHandler(config_entries.OptionsFlow):
                     realm=realm,
                     password=password,
                     verify_ssl=verify_ssl,
+                    token_name=token_name,
                 )
 
                 await self.hass.async_add_executor_job(
@@ -247,6 +328,12 @@ class ProxmoxOptionsFlowHandler(config_entries.OptionsFlow):
                                 **resource_lxc,
                             }
                         ),
+                        vol.Optional(
+                            CONF_ALL_GUESTS,
+                            default=self.config_entry.data.get(
+                                CONF_ALL_GUESTS, DEFAULT_ALL_GUESTS
+                            ),
+                        ): bool,
                     }
                 ),
             )
@@ -279,6 +366,24 @@ class ProxmoxOptionsFlowHandler(config_entries.OptionsFlow):
                     f"{self.config_entry.entry_id}_{node}_resource_nonexistent",
                 )
 
+        all_guests = user_input.get(CONF_ALL_GUESTS, DEFAULT_ALL_GUESTS)
+        old_qemu_ids = self.config_entry.data[CONF_QEMU]
+        old_lxc_ids = self.config_entry.data[CONF_LXC]
+        if self.config_entry.data.get(CONF_ALL_GUESTS, DEFAULT_ALL_GUESTS) and (
+            entry_data := self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
+        ):
+            # Every guest of the cluster was exposed, not only the selected ones
+            old_qemu_ids = [
+                coordinator.vm_id
+                for coordinator in entry_data[COORDINATORS].values()
+                if isinstance(coordinator, ProxmoxQEMUCoordinator)
+            ]
+            old_lxc_ids = [
+                coordinator.vm_id
+                for coordinator in entry_data[COORDINATORS].values()
+                if isinstance(coordinator, ProxmoxLXCCoordinator)
+            ]
+
         qemu_selecition = []
         if (
             CONF_QEMU in user_input
@@ -287,8 +392,8 @@ class ProxmoxOptionsFlowHandler(config_entries.OptionsFlow):
             for qemu in qemu_user:
                 qemu_selecition.append(qemu)
 
-        for qemu_id in self.config_entry.data[CONF_QEMU]:
-            if qemu_id not in qemu_selecition:
+        for qemu_id in old_qemu_ids:
+            if not all_guests and qemu_id not in qemu_selecition:
                 # Remove device
                 identifier = (
                     f"{self.config_entry.entry_id}_{ProxmoxType.QEMU.upper()}_{qemu_id}"
@@ -311,8 +416,8 @@ class ProxmoxOptionsFlowHandler(config_entries.OptionsFlow):
             for qemu in lxc_user:
                 lxc_selecition.append(qemu)
 
-        for lxc_id in self.config_entry.data[CONF_LXC]:
-            if lxc_id not in lxc_selecition:
+        for lxc_id in old_lxc_ids:
+            if not all_guests and lxc_id not in lxc_selecition:
                 # Remove device
                 identifier = (
                     f"{self.config_entry.entry_id}_{ProxmoxType.LXC.upper()}_{lxc_id}"
@@ -331,12 +436,17 @@ class ProxmoxOptionsFlowHandler(config_entries.OptionsFlow):
                 CONF_NODES: node_selecition,
                 CONF_QEMU: qemu_selecition,
                 CONF_LXC: lxc_selecition,
+                CONF_ALL_GUESTS: all_guests,
             }
         )
 
         self.hass.config_entries.async_update_entry(self.config_entry, data=config_data)
 
-        await self.hass.config_entries.async_reload(self.config_entry.entry_id)
+        if self.config_entry.state is config_entries.ConfigEntryState.LOADED:
+            # Only the added and removed resources are set up or torn down
+            await async_update_exposed_resources(self.hass, self.config_entry)
+        else:
+            await self.hass.config_entries.async_reload(self.config_entry.entry_id)
 
         return self.async_abort(reason="changes_successful")
 
@@ -364,7 +474,7 @@ class ProxmoxOptionsFlowHandler(config_entries.OptionsFlow):
 class ProxmoxVEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """ProxmoxVE Config Flow class."""
 
-    VERSION = 3
+    VERSION = 4
     _reauth_entry: config_entries.ConfigEntry | None = None
 
     def __init__(self) -> None:
@@ -569,6 +679,7 @@ class ProxmoxVEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             user: str = str(user_input.get(CONF_USERNAME))
             realm: str = str(user_input.get(CONF_REALM))
             password: str = str(user_input.get(CONF_PASSWORD))
+            token_name: str | None = user_input.get(CONF_TOKEN_NAME)
 
             try:
                 self._proxmox_client = ProxmoxClient(
@@ -578,6 +689,7 @@ class ProxmoxVEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     realm=realm,
                     password=password,
                     verify_ssl=verify_ssl,
+                    token_name=token_name,
                 )
 
                 await self.hass.async_add_executor_job(
@@ -604,6 +716,7 @@ class ProxmoxVEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         CONF_USERNAME: user_input.get(CONF_USERNAME),
                         CONF_PASSWORD: user_input.get(CONF_PASSWORD),
                         CONF_REALM: user_input.get(CONF_REALM),
+                        CONF_TOKEN_NAME: user_input.get(CONF_TOKEN_NAME),
                     }
                 )
                 self.hass.config_entries.async_update_entry(
@@ -647,6 +760,7 @@ class ProxmoxVEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             username = user_input.get(CONF_USERNAME, "")
             password = user_input.get(CONF_PASSWORD, "")
             realm = user_input.get(CONF_REALM, DEFAULT_REALM)
+            token_name = user_input.get(CONF_TOKEN_NAME)
             verify_ssl = user_input.get(CONF_VERIFY_SSL, DEFAULT_VERIFY_SSL)
 
             self._host = host
@@ -663,6 +777,7 @@ class ProxmoxVEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         realm=realm,
                         password=password,
                         verify_ssl=verify_ssl,
+                        token_name=token_name,
                     )
 
                     await self.hass.async_add_executor_job(
@@ -684,6 +799,7 @@ class ProxmoxVEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     self._config[CONF_USERNAME] = username
                     self._config[CONF_PASSWORD] = password
                     self._config[CONF_REALM] = realm
+                    self._config[CONF_TOKEN_NAME] = token_name
                     self._config[CONF_VERIFY_SSL] = verify_ssl
 
                     return await self.async_step_expose()
@@ -742,6 +858,7 @@ class ProxmoxVEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         vol.Required(CONF_NODES): cv.multi_select(resource_nodes),
                         vol.Optional(CONF_QEMU): cv.multi_select(resource_qemu),
                         vol.Optional(CONF_LXC): cv.multi_select(resource_lxc),
+                        vol.Optional(CONF_ALL_GUESTS, default=DEFAULT_ALL_GUESTS): bool,
                     }
                 ),
             )
@@ -773,6 +890,10 @@ class ProxmoxVEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             for lxc_selection in lxc_user:
                 self._config[CONF_LXC].append(lxc_selection)
 
+        self._config[CONF_ALL_GUESTS] = user_input.get(
+            CONF_ALL_GUESTS, DEFAULT_ALL_GUESTS
+        )
+
         return self.async_create_entry(
             title=(f"{self._config[CONF_HOST]}:" f"{self._config[CONF_PORT]}"),
             data=self._config,
@@ -12,25 +12,64 @@ CONF_NODES = "nodes"
 CONF_VMS = "vms"
 CONF_CONTAINERS = "containers"
 
+ATTR_COMMAND = "command"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_STALE = "stale"
+ATTR_TAGS = "tags"
+ATTR_VMIDS = "vmids"
+
+SERVICE_BULK_COMMAND = "bulk_command"
+
+CLUSTER_COORDINATOR = "cluster_coordinator"
+COMMAND_QUEUE = "command_queue"
 COORDINATORS = "coordinators"
 
+DEFAULT_ALL_GUESTS = False
+DEFAULT_ASYNC_CLIENT = False
+DEFAULT_KEEPALIVE_TIMEOUT = 120
+DEFAULT_MAX_CONCURRENT_REFRESH = 5
+DEFAULT_MAX_UPDATE_INTERVAL = 300
+DEFAULT_POOL_SIZE = 10
 DEFAULT_PORT = 8006
 DEFAULT_REALM = "pam"
 DEFAULT_VERIFY_SSL = True
 UPDATE_INTERVAL = 60
+BOOST_UPDATE_INTERVAL = 5
+BOOST_DURATION = 60
+VERSION_UPDATE_INTERVAL = 6 * 60 * 60
+DEBUG_PAYLOAD_INTERVAL = 10 * 60
+RETRY_UPDATE_INTERVAL = 5
+BREAKER_FAILURES = 3
+BREAKER_RETRY_INTERVAL = 30
+BREAKER_MAX_RETRY_INTERVAL = 30 * 60
+TASK_POLL_INTERVAL = 2
+TASK_TIMEOUT = 5 * 60
+STALE_MAX_AGE = 5 * 60
+STALE_MAX_AGE_STATIC = 60 * 60
 
 LOGGER = logging.getLogger(__package__)
 
+CONF_ALL_GUESTS = "all_guests"
+CONF_ASYNC_CLIENT = "async_client"
 CONF_CONTAINERS = "containers"
+CONF_KEEPALIVE_TIMEOUT = "keepalive_timeout"
 CONF_LXC = "lxc"
+CONF_MAX_CONCURRENT_REFRESH = "max_concurrent_refresh"
+CONF_MAX_UPDATE_INTERVAL = "max_update_interval"
+CONF_MIN_UPDATE_INTERVAL = "min_update_interval"
 CONF_NODE = "node"
 CONF_NODES = "nodes"
+CONF_POOL_SIZE = "pool_size"
 CONF_QEMU = "qemu"
 CONF_REALM = "realm"
+CONF_TOKEN_NAME = "token_name"
 CONF_VMS = "vms"
 
 PROXMOX_CLIENT = "proxmox_client"
 
+# Sent with the coordinators of the resources added to a loaded config entry
+SIGNAL_RESOURCES_ADDED = "proxmoxve_resources_added_{}"
+
 VERSION_REMOVE_YAML = "2023.8"
 
 
@@ -43,6 +82,14 @@ class ProxmoxType(StrEnum):
     LXC = "lxc"
 
 
+class ProxmoxCircuitState(StrEnum):
+    """State of the circuit breaker of an API endpoint."""
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
 class ProxmoxCommand(StrEnum):
     """Proxmox commands Nodes/VM/CT."""
 
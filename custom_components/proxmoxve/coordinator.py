@@ -1,16 +1,19 @@
 """DataUpdateCoordinators for the Proxmox VE integration."""
 from __future__ import annotations
 
-from datetime import timedelta
+from datetime import datetime, timedelta
+import logging
+import math
+from time import monotonic
 from typing import Any
 
-from proxmoxer import AuthenticationError, ProxmoxAPI
+from proxmoxer import AuthenticationError
 from proxmoxer.core import ResourceException
-from requests.exceptions import ConnectTimeout, SSLError
+from requests.exceptions import ConnectionError as connError, ConnectTimeout, SSLError
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PORT, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.issue_registry import (
     IssueSeverity,
@@ -19,26 +22,239 @@ from homeassistant.helpers.issue_registry import (
 )
 from homeassistant.helpers.typing import UNDEFINED, UndefinedType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+from homeassistant.util.async_ import gather_with_concurrency
+
+from .api import ProxmoxClient, current_poll
+from .const import (
+    BOOST_DURATION,
+    BOOST_UPDATE_INTERVAL,
+    CONF_ALL_GUESTS,
+    CONF_MAX_CONCURRENT_REFRESH,
+    DEBUG_PAYLOAD_INTERVAL,
+    DEFAULT_ALL_GUESTS,
+    DEFAULT_MAX_CONCURRENT_REFRESH,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DOMAIN,
+    LOGGER,
+    RETRY_UPDATE_INTERVAL,
+    UPDATE_INTERVAL,
+    VERSION_UPDATE_INTERVAL,
+    ProxmoxType,
+)
+from .models import (
+    ProxmoxCacheStats,
+    ProxmoxClusterData,
+    ProxmoxLXCData,
+    ProxmoxNodeData,
+    ProxmoxPollStats,
+    ProxmoxVMData,
+)
+
+
+# Fields of the guests missing from the cluster resources, by guest list of a node
+GUEST_LIST_FIELDS: dict[ProxmoxType, tuple[str, ...]] = {
+    ProxmoxType.QEMU: ("qmpstatus",),
+    ProxmoxType.LXC: ("swap", "maxswap"),
+}
+
+
+class ProxmoxUpdateSchedule:
+    """Update interval of a coordinator, chosen from the state of its resources.
+
+    Active resources are polled every `fast` seconds and idle ones every
+    `slow` seconds. After a command is sent, `boost` polls quickly for a
+    while so the state change shows up without waiting for the next poll.
+
+    The updates are aligned to a grid of the interval shifted by `phase`
+    (a fraction of the interval), so the coordinators of a config entry can
+    be spread evenly instead of all polling at the same moment.
+    """
+
+    def __init__(self, fast: int, slow: int) -> None:
+        """Initialize the update schedule."""
+        self.fast = fast
+        self.slow = max(slow, fast)
+        self.phase: float = 0
+        self._boost_until: float = 0
+
+    def boost(self) -> None:
+        """Poll quickly for the next BOOST_DURATION seconds."""
+        self._boost_until = monotonic() + BOOST_DURATION
+
+    def interval(self, active: bool) -> timedelta:
+        """Return the interval until the next update."""
+        if monotonic() < self._boost_until:
+            return timedelta(seconds=min(BOOST_UPDATE_INTERVAL, self.fast))
+        return timedelta(seconds=self.fast if active else self.slow)
+
+    def retry_interval(self, failures: int, active: bool) -> timedelta:
+        """Return the interval until the retry of a failed update.
+
+        It starts at RETRY_UPDATE_INTERVAL and doubles with each failure in a
+        row, up to the interval of the resources when they are active or idle.
+        """
+        return timedelta(
+            seconds=min(
+                RETRY_UPDATE_INTERVAL * 2 ** (failures - 1),
+                self.fast if active else self.slow,
+            )
+        )
 
-from .const import CONF_NODE, DOMAIN, LOGGER, UPDATE_INTERVAL, ProxmoxType
-from .models import ProxmoxNodeData, ProxmoxVMData, ProxmoxLXCData
+    def next_update(self, interval: timedelta) -> datetime:
+        """Return the next point of the interval grid shifted by the phase."""
+        period = interval.total_seconds()
+        offset = self.phase * period
+        now = dt_util.utcnow().timestamp()
+        return dt_util.utc_from_timestamp(
+            (math.floor((now - offset) / period) + 1) * period + offset
+        )
+
+    def delay(self, interval: timedelta) -> timedelta:
+        """Return the delay until the next update on the interval grid.
+
+        A point closer than half the interval is skipped, the refresh timer
+        isn't exact and an update a bit early must not be followed right away
+        by another one.
+        """
+        delay = self.next_update(interval) - dt_util.utcnow()
+        if delay < interval / 2:
+            delay += interval
+        return delay
+
+
+class ProxmoxScheduledCoordinator(DataUpdateCoordinator):
+    """Data update coordinator polling the API on the grid of its schedule.
+
+    The API usage of the last update is kept in `last_poll`. The interval
+    of the next update is chosen from the schedule after each update: up to
+    the next point of the grid of the interval of the resources after a
+    success, and sooner than that after a failure, backing off on each
+    failure in a row. The update interval is only used for the next update.
+    """
+
+    schedule: ProxmoxUpdateSchedule
+    last_poll: ProxmoxPollStats | None = None
+    _failures: int = 0
+
+    async def _async_update_data(self) -> Any:
+        """Poll the API, recording the requests made by the update."""
+        poll = ProxmoxPollStats()
+        token = current_poll.set(poll)
+        started = monotonic()
+        try:
+            data = await self._async_poll()
+        except UpdateFailed:
+            self._failures += 1
+            self._set_update_interval(
+                self.schedule.retry_interval(self._failures, self._is_active(self.data))
+            )
+            raise
+        finally:
+            current_poll.reset(token)
+            poll.duration = monotonic() - started
+            self.last_poll = poll
+        self._failures = 0
+        self._set_update_interval(
+            self.schedule.delay(self.schedule.interval(self._is_active(data)))
+        )
+        return data
+
+    def _set_update_interval(self, interval: timedelta) -> None:
+        """Set the interval until the next update, unless polling was stopped."""
+        if self.update_interval is not None:
+            self.update_interval = interval
+
+    @callback
+    def async_detach(self) -> None:
+        """Stop polling, the resources of the coordinator were removed.
+
+        No refresh is scheduled without an update interval, the pending one is
+        canceled when the entities of the resources stop listening.
+        """
+        self.update_interval = None
+
+    async def _async_poll(self) -> Any:
+        """Fetch the data from the API."""
+        raise NotImplementedError
+
+    def _is_active(self, data: Any) -> bool:
+        """Return True if the resources are active, given the data if known."""
+        raise NotImplementedError
 
 
 class ProxmoxCoordinator(
     DataUpdateCoordinator[ProxmoxNodeData | ProxmoxVMData | ProxmoxLXCData]
 ):
-    """Proxmox VE data update coordinator."""
-
-
-class ProxmoxNodeCoordinator(ProxmoxCoordinator):
+    """Proxmox VE data update coordinator.
+
+    The listeners are only notified when the data or the update success
+    differ from the last notification, so an idle resource doesn't make its
+    entities recompute their state on every poll. The listeners of the poll,
+    like the API usage sensors, are notified of the other updates.
+
+    When the updates fail, the data of the last successful update is kept
+    and `failed_since` tells since when, so the entities can keep showing it
+    for a while, marked stale.
+    """
+
+    failed_since: float | None = None
+    _notified: tuple[bool, Any] | None = None
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the Proxmox coordinator."""
+        super().__init__(*args, **kwargs)
+        self._poll_listeners: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_add_poll_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for the updates that don't change the data, return the remover."""
+        self._poll_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove the poll listener."""
+            self._poll_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners if what they read changed since the last time."""
+        if self.last_update_success:
+            self.failed_since = None
+        elif self.failed_since is None:
+            self.failed_since = monotonic()
+
+        notified = (self.last_update_success, self.data)
+        if notified == self._notified:
+            for update_callback in list(self._poll_listeners):
+                update_callback()
+            return
+        self._notified = notified
+        super().async_update_listeners()
+
+    async def async_boost(self) -> None:
+        """Refresh now, a command was sent to the resource."""
+        await self.async_request_refresh()
+
+    async def async_command_completed(self) -> None:
+        """Refresh now, the task of a command on the resource completed."""
+        await self.async_request_refresh()
+
+
+class ProxmoxNodeCoordinator(ProxmoxScheduledCoordinator, ProxmoxCoordinator):
     """Proxmox VE Node data update coordinator."""
 
     def __init__(
         self,
         hass: HomeAssistant,
-        proxmox: ProxmoxAPI,
+        proxmox_client: ProxmoxClient,
+        cluster_coordinator: ProxmoxClusterCoordinator,
         host_name: str,
         node_name: str,
+        min_update_interval: int = UPDATE_INTERVAL,
+        max_update_interval: int = DEFAULT_MAX_UPDATE_INTERVAL,
     ) -> None:
         """Initialize the Proxmox Node coordinator."""
 
@@ -46,35 +262,98 @@ class ProxmoxNodeCoordinator(ProxmoxCoordinator):
             hass,
             LOGGER,
             name=f"proxmox_coordinator_{host_name}_{node_name}",
-            update_interval=timedelta(seconds=UPDATE_INTERVAL),
+            update_interval=timedelta(seconds=min_update_interval),
         )
 
         self.hass = hass
         self.config_entry: ConfigEntry = self.config_entry
-        self.proxmox = proxmox
+        self.proxmox_client = proxmox_client
+        self.cluster_coordinator = cluster_coordinator
         self.node_name = node_name
+        self.schedule = ProxmoxUpdateSchedule(min_update_interval, max_update_interval)
+        self._version: dict[str, Any] | None = None
+        self._version_updated: float = 0
+        self._uptime: int = 0
+        self.version_cache = ProxmoxCacheStats()
+        self.last_payload: dict[str, Any] | None = None
+
+    async def async_boost(self) -> None:
+        """Refresh now and poll quickly while a command takes effect."""
+        self.schedule.boost()
+        # Node commands like startall change the state of the guests too
+        await self.cluster_coordinator.async_boost()
+        await self.async_request_refresh()
+
+    async def async_command_completed(self) -> None:
+        """Refresh now, the task of a command on the node completed."""
+        await self.cluster_coordinator.async_request_refresh()
+        await self.async_request_refresh()
+
+    def _is_active(self, data: ProxmoxNodeData | None) -> bool:
+        """Return True unless the cluster resources show the node offline.
+
+        The status comes from the cluster snapshot rather than the data of the
+        node, so an offline node, which fails to answer, is retried slowly.
+        """
+        return (
+            (cluster_data := self.cluster_coordinator.data) is None
+            or (node_api := cluster_data.nodes.get(self.node_name)) is None
+            or node_api["status"] == "online"
+        )
+
+    @callback
+    def invalidate_version(self) -> None:
+        """Fetch the node version again on the next update."""
+        self._version = None
+
+    def _version_expired(self, uptime: int) -> bool:
+        """Return True if the cached node version must be fetched again.
+
+        The version only changes with an upgrade, which is followed by a
+        reboot of the node, so it's also fetched when the uptime goes down.
+        """
+        return (
+            self._version is None
+            or uptime < self._uptime
+            or monotonic() - self._version_updated >= VERSION_UPDATE_INTERVAL
+        )
 
-    async def _async_update_data(self) -> ProxmoxNodeData:
+    async def _async_poll(self) -> ProxmoxNodeData:
         """Update data  for Proxmox Node."""
 
-        def poll_api() -> dict[str, Any] | None:
+        async def poll_api() -> dict[str, Any] | None:
             """Return data from the Proxmox Node API."""
             try:
-                api_status = self.proxmox.nodes(self.node_name).status.get()
-                if nodes_api := self.proxmox.nodes.get():
-                    for node_api in nodes_api:
-                        if node_api[CONF_NODE] == self.node_name:
-                            api_status["status"] = node_api["status"]
-                            api_status["cpu"] = node_api["cpu"]
-                            api_status["disk_max"] = node_api["maxdisk"]
-                            api_status["disk_used"] = node_api["disk"]
-                            break
-                api_status["version"] = self.proxmox.nodes(self.node_name).version.get()
+                # The nodes list is shared by all nodes through the cluster resources
+                if (cluster_data := self.cluster_coordinator.data) is None or (
+                    node_api := cluster_data.nodes.get(self.node_name)
+                ) is None:
+                    raise UpdateFailed(
+                        f"Node {self.node_name} not found in the cluster resources"
+                    )
+                api_status = await self.proxmox_client.async_get(
+                    "nodes", self.node_name, "status"
+                )
+                api_status["status"] = node_api["status"]
+                api_status["cpu"] = node_api["cpu"]
+                api_status["disk_max"] = node_api["maxdisk"]
+                api_status["disk_used"] = node_api["disk"]
+                if self._version_expired(api_status["uptime"]):
+                    self.version_cache.misses += 1
+                    self._version = await self.proxmox_client.async_get(
+                        "nodes", self.node_name, "version"
+                    )
+                    self._version_updated = monotonic()
+                else:
+                    self.version_cache.hits += 1
+                self._uptime = api_status["uptime"]
+                api_status["version"] = self._version
 
             except (
                 AuthenticationError,
                 SSLError,
                 ConnectTimeout,
+                connError,
             ) as error:
                 raise UpdateFailed(error) from error
             except ResourceException as error:
@@ -94,6 +373,7 @@ class ProxmoxNodeCoordinator(ProxmoxCoordinator):
                     raise UpdateFailed(
                         "User not allowed to access the resource, check user permissions as per the documentation."
                     ) from error
+                raise UpdateFailed(error) from error
 
             async_delete_issue(
                 self.hass,
@@ -102,14 +382,10 @@ class ProxmoxNodeCoordinator(ProxmoxCoordinator):
             )
 
             LOGGER.debug("API Response - Node: %s", api_status)
+            self.last_payload = api_status
             return api_status
 
-        api_status = await self.hass.async_add_executor_job(poll_api)
-
-        if api_status is None:
-            raise UpdateFailed(
-                f"Node {self.node_name} unable to be found in host {self.config_entry.data[CONF_HOST]}"
-            )
+        api_status = await poll_api()
 
         return ProxmoxNodeData(
             model=api_status["cpuinfo"]["model"],
@@ -128,225 +404,430 @@ class ProxmoxNodeCoordinator(ProxmoxCoordinator):
         )
 
 
-class ProxmoxQEMUCoordinator(ProxmoxCoordinator):
-    """Proxmox VE QEMU data update coordinator."""
+class ProxmoxClusterCoordinator(
+    ProxmoxScheduledCoordinator, DataUpdateCoordinator[ProxmoxClusterData]
+):
+    """Proxmox VE cluster resources data update coordinator.
+
+    Fetches `/cluster/resources` once per interval and shares the snapshot
+    with the QEMU and LXC coordinators of the config entry, completed by the
+    guest lists of the nodes hosting running watched guests. The snapshot is
+    fetched quickly while any watched node is online or guest is running.
+    """
 
     def __init__(
         self,
         hass: HomeAssistant,
-        proxmox: ProxmoxAPI,
+        proxmox_client: ProxmoxClient,
         host_name: str,
-        qemu_id: int,
+        watched_nodes: set[str],
+        watched_guests: set[int],
+        min_update_interval: int = UPDATE_INTERVAL,
+        max_update_interval: int = DEFAULT_MAX_UPDATE_INTERVAL,
     ) -> None:
-        """Initialize the Proxmox QEMU coordinator."""
+        """Initialize the Proxmox cluster coordinator."""
 
         super().__init__(
             hass,
             LOGGER,
-            name=f"proxmox_coordinator_{host_name}_{qemu_id}",
-            update_interval=timedelta(seconds=UPDATE_INTERVAL),
+            name=f"proxmox_coordinator_{host_name}_cluster",
+            update_interval=timedelta(seconds=min_update_interval),
         )
 
         self.hass = hass
         self.config_entry: ConfigEntry = self.config_entry
-        self.proxmox = proxmox
-        self.node_name: str
-        self.vm_id = qemu_id
-
-    async def _async_update_data(self) -> ProxmoxVMData:
-        """Update data  for Proxmox QEMU."""
-
-        def poll_api() -> dict[str, Any] | None:
-            """Return data from the Proxmox QEMU API."""
-            node_name = None
-            try:
-                api_status = None
-
-                resources = self.proxmox.cluster.resources.get()
-                LOGGER.debug("API Response - Resources: %s", resources)
-
-                for resource in resources:
-                    if "vmid" in resource:
-                        if int(resource["vmid"]) == int(self.vm_id):
-                            node_name = resource["node"]
-
-                self.node_name = str(node_name)
-                if self.node_name is not None:
-                    api_status = (
-                        self.proxmox.nodes(self.node_name)
-                        .qemu(self.vm_id)
-                        .status.current.get()
-                    )
+        self.proxmox_client = proxmox_client
+        self.schedule = ProxmoxUpdateSchedule(min_update_interval, max_update_interval)
+        self.watched_nodes = watched_nodes
+        self.watched_guests = watched_guests
+        self._payload_logged: float | None = None
+
+    async def async_boost(self) -> None:
+        """Refresh now and poll quickly while a command takes effect."""
+        self.schedule.boost()
+        await self.async_request_refresh()
+
+    async def async_command_completed(self) -> None:
+        """Refresh now, the task of a command on the cluster guests completed."""
+        await self.async_request_refresh()
+
+    def _is_active(self, data: ProxmoxClusterData | None) -> bool:
+        """Return True if a watched node is online or guest is running."""
+        if data is None:
+            return True
+        for node in self.watched_nodes:
+            if (resource := data.nodes.get(node)) and resource["status"] == "online":
+                return True
+        for vm_id in self.watched_guests:
+            if (resource := data.guests.get(vm_id)) and is_guest_active(resource):
+                return True
+        return False
+
+    async def _async_poll(self) -> ProxmoxClusterData:
+        """Update data for the Proxmox cluster resources."""
 
-            except (
-                AuthenticationError,
-                SSLError,
-                ConnectTimeout,
-            ) as error:
-                raise UpdateFailed(error) from error
-            except ResourceException as error:
-                if error.status_code == 403:
-                    async_create_issue(
-                        self.hass,
-                        DOMAIN,
-                        f"{self.config_entry.entry_id}_{self.vm_id}_forbiden",
-                        is_fixable=False,
-                        severity=IssueSeverity.ERROR,
-                        translation_key="resource_exception_forbiden",
-                        translation_placeholders={
-                            "resource": f"QEMU {self.vm_id}",
-                            "user": self.config_entry.data[CONF_USERNAME],
-                        },
-                    )
-                    raise UpdateFailed(
-                        "User not allowed to access the resource, check user permissions as per the documentation."
-                    ) from error
+        try:
+            resources = await self.proxmox_client.async_get("cluster", "resources")
+        except (
+            AuthenticationError,
+            SSLError,
+            ConnectTimeout,
+            connError,
+        ) as error:
+            raise UpdateFailed(error) from error
+        except ResourceException as error:
+            if error.status_code == 403:
+                async_create_issue(
+                    self.hass,
+                    DOMAIN,
+                    f"{self.config_entry.entry_id}_cluster_forbiden",
+                    is_fixable=False,
+                    severity=IssueSeverity.ERROR,
+                    translation_key="resource_exception_forbiden",
+                    translation_placeholders={
+                        "resource": "Cluster resources",
+                        "user": self.config_entry.data[CONF_USERNAME],
+                    },
+                )
+                raise UpdateFailed(
+                    "User not allowed to access the resource, check user permissions as per the documentation."
+                ) from error
+            raise UpdateFailed(error) from error
+
+        async_delete_issue(
+            self.hass,
+            DOMAIN,
+            f"{self.config_entry.entry_id}_cluster_forbiden",
+        )
 
-            async_delete_issue(
-                self.hass,
-                DOMAIN,
-                f"{self.config_entry.entry_id}_{self.vm_id}_forbiden",
+        if resources is None:
+            raise UpdateFailed(
+                f"No resources returned by host {self.config_entry.data[CONF_HOST]}"
             )
 
-            LOGGER.debug("API Response - QEMU: %s", api_status)
-            return api_status
+        await self._async_add_guest_list_fields(resources)
 
-        api_status = await self.hass.async_add_executor_job(poll_api)
+        data = ProxmoxClusterData(
+            resources=resources,
+            nodes={
+                resource["node"]: resource
+                for resource in resources
+                if resource.get("type") == ProxmoxType.Node
+            },
+            guests={
+                resource["vmid"]: resource
+                for resource in resources
+                if "vmid" in resource
+            },
+        )
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            self._log_snapshot(data)
+        return data
 
-        if api_status is None or "status" not in api_status:
-            raise UpdateFailed(f"Vm/Container {self.vm_id} unable to be found")
+    async def _async_add_guest_list_fields(
+        self, resources: list[dict[str, Any]]
+    ) -> None:
+        """Add the GUEST_LIST_FIELDS of the running watched guests to their rows.
+
+        They come from the QEMU or LXC guest list of the node, one request
+        for all the guests of the type on the node. A list is only fetched
+        when a running watched guest needs it, stopped guests are left
+        without the fields. A failed list leaves the rows without them too,
+        it doesn't fail the snapshot. The lists of the nodes are fetched
+        in parallel, up to the max concurrent refresh of the config entry.
+
+        In all guests mode every guest is watched, including the ones new to
+        the snapshot, whose coordinators are only created after the poll.
+        """
+        all_guests = self.config_entry.data.get(CONF_ALL_GUESTS, DEFAULT_ALL_GUESTS)
+        guest_lists: set[tuple[str, ProxmoxType]] = {
+            (resource["node"], resource["type"])
+            for resource in resources
+            if (all_guests or resource.get("vmid") in self.watched_guests)
+            and resource.get("type") in GUEST_LIST_FIELDS
+            and is_guest_active(resource)
+        }
+        if not guest_lists:
+            return
 
-        update_device_via(self, ProxmoxType.QEMU)
-        return ProxmoxVMData(
-            status=api_status["status"],
-            name=api_status["name"],
-            node=self.node_name,
-            health=api_status["qmpstatus"],
-            uptime=api_status["uptime"],
-            cpu=api_status["cpu"],
-            memory_total=api_status["maxmem"],
-            memory_used=api_status["mem"],
-            memory_free=api_status["maxmem"] - api_status["mem"],
-            network_in=api_status["netin"],
-            network_out=api_status["netout"],
-            disk_total=api_status["maxdisk"],
-            disk_used=api_status["disk"],
+        async def async_get_guest_list(
+            node: str, api_category: ProxmoxType
+        ) -> list[dict[str, Any]]:
+            """Return the guest list, or an empty list if it can't be fetched."""
+            try:
+                return await self.proxmox_client.async_get(
+                    "nodes",
+                    node,
+                    api_category,
+                    # The QMP status is only returned with the full status
+                    **({"full": 1} if api_category == ProxmoxType.QEMU else {}),
+                )
+            except (ResourceException, ConnectTimeout, connError) as error:
+                LOGGER.debug(
+                    "Unable to fetch the %s list of node %s: %s",
+                    api_category,
+                    node,
+                    error,
+                )
+                return []
+
+        # The nodes answer in parallel, the poll takes as long as the slowest one
+        ordered_lists = sorted(guest_lists)
+        guest_list_results = await gather_with_concurrency(
+            self.config_entry.data.get(
+                CONF_MAX_CONCURRENT_REFRESH, DEFAULT_MAX_CONCURRENT_REFRESH
+            ),
+            *(
+                async_get_guest_list(node, api_category)
+                for node, api_category in ordered_lists
+            ),
+        )
+
+        rows = {
+            resource["vmid"]: resource for resource in resources if "vmid" in resource
+        }
+        for (_, api_category), guests in zip(ordered_lists, guest_list_results):
+            for guest in guests or []:
+                if (resource := rows.get(int(guest["vmid"]))) is None:
+                    continue
+                for field in GUEST_LIST_FIELDS[api_category]:
+                    if field in guest:
+                        resource[field] = guest[field]
+
+    def _log_snapshot(self, data: ProxmoxClusterData) -> None:
+        """Log a summary of the snapshot, and the full payload from time to time.
+
+        The payload is megabytes of text on large clusters, it's only dumped
+        every DEBUG_PAYLOAD_INTERVAL seconds.
+        """
+        LOGGER.debug(
+            "Cluster resources of %s: %s nodes, %s guests (%s running), "
+            "next update in %s, connections: %s",
+            self.name,
+            len(data.nodes),
+            len(data.guests),
+            sum(is_guest_active(resource) for resource in data.guests.values()),
+            self.schedule.interval(self._is_active(data)),
+            self.proxmox_client.connection_stats,
         )
+        if (
+            self._payload_logged is None
+            or monotonic() - self._payload_logged >= DEBUG_PAYLOAD_INTERVAL
+        ):
+            self._payload_logged = monotonic()
+            LOGGER.debug("API Response - Resources: %s", data.resources)
 
 
-class ProxmoxLXCCoordinator(ProxmoxCoordinator):
-    """Proxmox VE LXC data update coordinator."""
+class ProxmoxGuestCoordinator(ProxmoxCoordinator):
+    """Proxmox VE guest view of the cluster resources snapshot.
+
+    The guest coordinators don't poll on their own, they are updated every
+    time the cluster coordinator fetches a new snapshot. Stopped guests and
+    templates are only updated at the slow interval, or when their status
+    changes.
+    """
+
+    api_category: ProxmoxType
 
     def __init__(
         self,
         hass: HomeAssistant,
-        proxmox: ProxmoxAPI,
+        cluster_coordinator: ProxmoxClusterCoordinator,
         host_name: str,
-        container_id: int,
+        vm_id: int,
     ) -> None:
-        """Initialize the Proxmox LXC coordinator."""
+        """Initialize the Proxmox guest coordinator."""
 
         super().__init__(
             hass,
             LOGGER,
-            name=f"proxmox_coordinator_{host_name}_{container_id}",
-            update_interval=timedelta(seconds=UPDATE_INTERVAL),
+            name=f"proxmox_coordinator_{host_name}_{vm_id}",
+            update_interval=None,
         )
 
         self.hass = hass
-        self.config_entry: ConfigEntry = self.config_entry
-        self.proxmox = proxmox
-        self.vm_id = container_id
+        self.config_entry: ConfigEntry = cluster_coordinator.config_entry
+        self.cluster_coordinator = cluster_coordinator
         self.node_name: str
+        self.vm_id = vm_id
+        self._vm_id = int(vm_id)
+        self._last_update: float = 0
+        # Node of the guest the last time its device was linked to the node device
+        self._via_node: str | None = None
+
+        self._unsub_cluster: CALLBACK_TYPE | None = (
+            cluster_coordinator.async_add_listener(self.async_handle_cluster_update)
+        )
 
-    async def _async_update_data(self) -> ProxmoxLXCData:
-        """Update data  for Proxmox LXC."""
+    async def async_boost(self) -> None:
+        """Refresh now and poll quickly while a command takes effect."""
+        await self.cluster_coordinator.async_boost()
+
+    async def async_command_completed(self) -> None:
+        """Refresh now, the task of a command on the guest completed."""
+        await self.cluster_coordinator.async_request_refresh()
+
+    @callback
+    def async_detach(self) -> None:
+        """Stop following the cluster snapshots, the guest is removed or unloaded."""
+        if self._unsub_cluster is not None:
+            self._unsub_cluster()
+            self._unsub_cluster = None
+
+    @callback
+    def async_handle_cluster_update(self) -> None:
+        """Update the guest data from the new cluster snapshot."""
+        if not self.cluster_coordinator.last_update_success:
+            self.async_set_update_error(
+                UpdateFailed(
+                    f"Cluster resources unavailable: {self.cluster_coordinator.last_exception}"
+                )
+            )
+            return
 
-        def poll_api() -> dict[str, Any] | None:
-            """Return data from the Proxmox LXC API."""
-            node_name = None
-            try:
-                api_status = None
-
-                resources = self.proxmox.cluster.resources.get()
-                LOGGER.debug("API Response - Resources: %s", resources)
-
-                for resource in resources:
-                    if "vmid" in resource:
-                        if int(resource["vmid"]) == int(self.vm_id):
-                            node_name = resource["node"]
-
-                self.node_name = str(node_name)
-                if node_name is not None:
-                    api_status = (
-                        self.proxmox.nodes(self.node_name)
-                        .lxc(self.vm_id)
-                        .status.current.get()
-                    )
+        try:
+            data = self._parse_snapshot()
+        except UpdateFailed as error:
+            self.async_set_update_error(error)
+            return
+
+        if (
+            self.last_update_success
+            and self.data is not None
+            and self.data.status == data.status
+            and not is_guest_active(self.cluster_coordinator.data.guests[self._vm_id])
+            and monotonic() - self._last_update < self.cluster_coordinator.schedule.slow
+        ):
+            return
+
+        self._last_update = monotonic()
+        self.async_set_updated_data(data)
+
+    async def _async_update_data(self) -> ProxmoxVMData | ProxmoxLXCData:
+        """Update data from the last cluster snapshot."""
+        if self.cluster_coordinator.data is None:
+            raise UpdateFailed(f"Cluster resources unavailable for {self.vm_id}")
+
+        return self._parse_snapshot()
+
+    def _parse_snapshot(self) -> ProxmoxVMData | ProxmoxLXCData:
+        """Return the guest data from the cluster snapshot."""
+        resource = self.cluster_coordinator.data.guests.get(self._vm_id)
+        if resource is None or "status" not in resource:
+            raise UpdateFailed(f"Vm/Container {self.vm_id} unable to be found")
 
-            except (
-                AuthenticationError,
-                SSLError,
-                ConnectTimeout,
-            ) as error:
-                raise UpdateFailed(error) from error
-            except ResourceException as error:
-                if error.status_code == 403:
-                    async_create_issue(
-                        self.hass,
-                        DOMAIN,
-                        f"{self.config_entry.entry_id}_{self.vm_id}_forbiden",
-                        is_fixable=False,
-                        severity=IssueSeverity.ERROR,
-                        translation_key="resource_exception_forbiden",
-                        translation_placeholders={
-                            "resource": f"LXC {self.node_name}",
-                            "user": self.config_entry.data[CONF_USERNAME],
-                        },
-                    )
-                    raise UpdateFailed(
-                        "User not allowed to access the resource, check user permissions as per the documentation."
-                    ) from error
+        node_name = resource["node"]
+        self.node_name = node_name
+        if self._via_node != node_name and update_device_via(self, self.api_category):
+            self._via_node = node_name
+        return self._parse_resource(resource)
 
-            async_delete_issue(
-                self.hass,
-                DOMAIN,
-                f"{self.config_entry.entry_id}_{self.vm_id}_forbiden",
-            )
+    def _parse_resource(
+        self, resource: dict[str, Any]
+    ) -> ProxmoxVMData | ProxmoxLXCData:
+        """Return the guest data from a cluster resource row."""
+        raise NotImplementedError
 
-            LOGGER.debug("API Response - LXC: %s", api_status)
-            return api_status
 
-        api_status = await self.hass.async_add_executor_job(poll_api)
+class ProxmoxQEMUCoordinator(ProxmoxGuestCoordinator):
+    """Proxmox VE QEMU data update coordinator."""
+
+    api_category = ProxmoxType.QEMU
 
-        if api_status is None or "status" not in api_status:
-            raise UpdateFailed(f"Vm/Container {self.vm_id} unable to be found")
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        cluster_coordinator: ProxmoxClusterCoordinator,
+        host_name: str,
+        qemu_id: int,
+    ) -> None:
+        """Initialize the Proxmox QEMU coordinator."""
+
+        super().__init__(
+            hass,
+            cluster_coordinator=cluster_coordinator,
+            host_name=host_name,
+            vm_id=qemu_id,
+        )
+
+    def _parse_resource(self, resource: dict[str, Any]) -> ProxmoxVMData:
+        """Return the QEMU data from a cluster resource row."""
+        return ProxmoxVMData(
+            status=resource["status"],
+            name=resource["name"],
+            node=self.node_name,
+            # Unknown when the guest list is not fetched or failed
+            health=resource.get("qmpstatus"),
+            uptime=resource["uptime"],
+            cpu=resource["cpu"],
+            memory_total=resource["maxmem"],
+            memory_used=resource["mem"],
+            memory_free=resource["maxmem"] - resource["mem"],
+            network_in=resource["netin"],
+            network_out=resource["netout"],
+            disk_total=resource["maxdisk"],
+            disk_used=resource["disk"],
+        )
+
+
+class ProxmoxLXCCoordinator(ProxmoxGuestCoordinator):
+    """Proxmox VE LXC data update coordinator."""
+
+    api_category = ProxmoxType.LXC
 
-        update_device_via(self, ProxmoxType.LXC)
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        cluster_coordinator: ProxmoxClusterCoordinator,
+        host_name: str,
+        container_id: int,
+    ) -> None:
+        """Initialize the Proxmox LXC coordinator."""
+
+        super().__init__(
+            hass,
+            cluster_coordinator=cluster_coordinator,
+            host_name=host_name,
+            vm_id=container_id,
+        )
+
+    def _parse_resource(self, resource: dict[str, Any]) -> ProxmoxLXCData:
+        """Return the LXC data from a cluster resource row."""
+        # Only fetched for running containers
+        swap_total = resource.get("maxswap", 0)
+        swap_used = resource.get("swap", 0)
         return ProxmoxLXCData(
-            status=api_status["status"],
-            name=api_status["name"],
+            status=resource["status"],
+            name=resource["name"],
             node=self.node_name,
-            uptime=api_status["uptime"],
-            cpu=api_status["cpu"],
-            memory_total=api_status["maxmem"],
-            memory_used=api_status["mem"],
-            memory_free=api_status["maxmem"] - api_status["mem"],
-            network_in=api_status["netin"],
-            network_out=api_status["netout"],
-            disk_total=api_status["maxdisk"],
-            disk_used=api_status["disk"],
-            swap_total=api_status["maxswap"],
-            swap_used=api_status["swap"],
-            swap_free=api_status["maxswap"] - api_status["swap"],
+            uptime=resource["uptime"],
+            cpu=resource["cpu"],
+            memory_total=resource["maxmem"],
+            memory_used=resource["mem"],
+            memory_free=resource["maxmem"] - resource["mem"],
+            network_in=resource["netin"],
+            network_out=resource["netout"],
+            disk_total=resource["maxdisk"],
+            disk_used=resource["disk"],
+            swap_total=swap_total,
+            swap_used=swap_used,
+            swap_free=swap_total - swap_used,
         )
 
 
+def is_guest_active(resource: dict[str, Any]) -> bool:
+    """Return True if the guest of the cluster resource row is running."""
+    return resource.get("status") == "running" and not resource.get("template")
+
+
 def update_device_via(
     self,
     api_category: ProxmoxType,
-) -> None:
-    """Return the Device Info."""
+) -> bool:
+    """Link the device of the guest to the device of its node.
+
+    Returns False if the node device isn't registered yet.
+    """
     dev_reg = dr.async_get(self.hass)
     device = dev_reg.async_get_or_create(
         config_entry_id=self.config_entry.entry_id,
@@ -378,6 +859,7 @@ def update_device_via(
             via_device_id=via_device_id,
             entry_type=dr.DeviceEntryType.SERVICE,
         )
+    return via_device is not None
 
 
 async def verify_permissions_error(
@@ -390,20 +872,24 @@ async def verify_permissions_error(
     permissions: bool = False
     if resource_type == ProxmoxType.Node:
         try:
-            self.proxmox.nodes(resource).status.get()
+            await self.proxmox_client.async_get("nodes", resource, "status")
         except ResourceException as error:
             if error.status_code == 403:
                 permissions = True
     if resource_type == ProxmoxType.QEMU:
         try:
-            self.proxmox.nodes(resource_node).qemu(resource).get()
+            await self.proxmox_client.async_get(
+                "nodes", resource_node, ProxmoxType.QEMU, resource
+            )
         except ResourceException as error:
             if error.status_code == 403:
                 permissions = True
 
     if resource_type == ProxmoxType.LXC:
         try:
-            self.proxmox.nodes(resource_node).lxc(resource).get()
+            await self.proxmox_client.async_get(
+                "nodes", resource_node, ProxmoxType.LXC, resource
+            )
         except ResourceException as error:
             if error.status_code == 403:
                 permissions = True
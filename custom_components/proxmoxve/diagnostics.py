@@ -0,0 +1,146 @@
+"""Diagnostics support for Proxmox VE."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+import dataclasses
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .api import LATENCY_BUCKETS, ProxmoxClient
+from .const import (
+    CLUSTER_COORDINATOR,
+    CONF_TOKEN_NAME,
+    COORDINATORS,
+    DOMAIN,
+    PROXMOX_CLIENT,
+)
+from .coordinator import (
+    ProxmoxClusterCoordinator,
+    ProxmoxGuestCoordinator,
+    ProxmoxNodeCoordinator,
+)
+
+# The entry title is "host:port"
+TO_REDACT = {CONF_HOST, CONF_PASSWORD, CONF_TOKEN_NAME, CONF_USERNAME, "title"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    proxmox_client: ProxmoxClient = entry_data[PROXMOX_CLIENT]
+    cluster_coordinator: ProxmoxClusterCoordinator = entry_data[CLUSTER_COORDINATOR]
+
+    return {
+        "config_entry": async_redact_data(config_entry.as_dict(), TO_REDACT),
+        "api": {
+            "connections": dataclasses.asdict(proxmox_client.connection_stats),
+            "executor_wait": _latency_summary(proxmox_client.executor_waits),
+            "endpoints": {
+                endpoint: {
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "bytes_received": stats.bytes_received,
+                    "latency": _latency_summary(stats.latencies),
+                    "histogram": dict(
+                        zip(
+                            [f"<={bound}s" for bound in LATENCY_BUCKETS]
+                            + [f">{LATENCY_BUCKETS[-1]}s"],
+                            stats.histogram,
+                        )
+                    ),
+                }
+                for endpoint, stats in proxmox_client.endpoint_stats.items()
+            },
+            # Only the endpoints failing at the moment
+            "circuit_breakers": {
+                path: {"state": breaker.state, "failures": breaker.failures}
+                for path, breaker in proxmox_client.circuit_breakers.items()
+                if breaker.failures
+            },
+        },
+        "coordinators": {
+            "cluster": {
+                **_coordinator_summary(cluster_coordinator),
+                "payload": (
+                    cluster_coordinator.data.resources
+                    if cluster_coordinator.data is not None
+                    else None
+                ),
+            },
+            **{
+                str(resource_id): _resource_coordinator_summary(coordinator)
+                for resource_id, coordinator in entry_data[COORDINATORS].items()
+            },
+        },
+    }
+
+
+def _resource_coordinator_summary(
+    coordinator: ProxmoxNodeCoordinator | ProxmoxGuestCoordinator,
+) -> dict[str, Any]:
+    """Return the state and last payload of a node or guest coordinator."""
+    if isinstance(coordinator, ProxmoxNodeCoordinator):
+        return {
+            **_coordinator_summary(coordinator),
+            "version_cache": {
+                **dataclasses.asdict(coordinator.version_cache),
+                "hit_rate": coordinator.version_cache.hit_rate,
+            },
+            "payload": coordinator.last_payload,
+        }
+
+    cluster_data = coordinator.cluster_coordinator.data
+    return {
+        **_coordinator_summary(coordinator),
+        "payload": (
+            cluster_data.guests.get(int(coordinator.vm_id))
+            if cluster_data is not None
+            else None
+        ),
+    }
+
+
+def _coordinator_summary(coordinator: DataUpdateCoordinator) -> dict[str, Any]:
+    """Return the update state of a coordinator."""
+    summary: dict[str, Any] = {
+        "last_update_success": coordinator.last_update_success,
+        "last_exception": (
+            repr(coordinator.last_exception) if coordinator.last_exception else None
+        ),
+        "update_interval": (
+            coordinator.update_interval.total_seconds()
+            if coordinator.update_interval is not None
+            else None
+        ),
+    }
+    if (schedule := getattr(coordinator, "schedule", None)) is not None:
+        summary["phase"] = schedule.phase
+    if (poll := getattr(coordinator, "last_poll", None)) is not None:
+        summary["last_poll"] = dataclasses.asdict(poll)
+    return summary
+
+
+def _latency_summary(samples: Iterable[float]) -> dict[str, Any]:
+    """Return the count, p50, p95 and p99 of recent latencies, in seconds."""
+    values = sorted(samples)
+    if not values:
+        return {"samples": 0}
+
+    def percentile(rank: float) -> float:
+        return round(values[min(int(rank * len(values)), len(values) - 1)], 4)
+
+    return {
+        "samples": len(values),
+        "p50": percentile(0.5),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": round(values[-1], 4),
+    }
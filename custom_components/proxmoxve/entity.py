@@ -1,15 +1,28 @@
 """Proxmox parent entity class."""
 
+from datetime import datetime
+from time import monotonic
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
 )
+
+from .const import ATTR_STALE
 from .models import ProxmoxEntityDescription
 
+
 class ProxmoxEntity(CoordinatorEntity):
     """Represents any entity created for the Proxmox VE platform."""
 
     _attr_has_entity_name = True
+    entity_description: ProxmoxEntityDescription
+    # Availability, state and attributes of the last write triggered by the coordinator
+    _last_written: tuple[bool, Any, Any] | None = None
+    _unsub_stale: CALLBACK_TYPE | None = None
 
     def __init__(
         self,
@@ -26,5 +39,64 @@ class ProxmoxEntity(CoordinatorEntity):
 
     @property
     def available(self) -> bool:
-        """Return True if entity is available."""
-        return self.coordinator.last_update_success
+        """Return True if entity is available.
+
+        While the updates fail, the last good value stays available for the
+        stale max age of the entity.
+        """
+        return self.coordinator.last_update_success or self._stale_time_left() > 0
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Mark the state as stale when it's the last good value."""
+        if self.coordinator.last_update_success:
+            return None
+        return {ATTR_STALE: True}
+
+    def _stale_time_left(self) -> float:
+        """Return the seconds the last good value can still be shown."""
+        if (failed_since := self.coordinator.failed_since) is None:
+            return 0
+        return max(
+            0, failed_since + self.entity_description.stale_max_age - monotonic()
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the state written when the entity is added."""
+        await super().async_added_to_hass()
+        self._last_written = self._written_state()
+        self.async_on_remove(self._async_cancel_stale_expiry)
+
+    def _written_state(self) -> tuple[bool, Any, Any]:
+        """Return what the state machine holds for the entity."""
+        return (self.available, self.state, self.extra_state_attributes)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the availability, state or attributes changed.
+
+        When a last good value is shown, its expiry is scheduled to turn the
+        entity unavailable even if the coordinator doesn't notify again.
+        """
+        if (time_left := self._stale_time_left()) > 0 and self._unsub_stale is None:
+            self._unsub_stale = async_call_later(
+                self.hass, time_left, self._async_stale_expired
+            )
+        written = self._written_state()
+        if written == self._last_written:
+            return
+        self._last_written = written
+        super()._handle_coordinator_update()
+
+    @callback
+    def _async_stale_expired(self, _now: datetime) -> None:
+        """Turn unavailable once the last good value is too old to be shown."""
+        self._unsub_stale = None
+        self._handle_coordinator_update()
+
+    @callback
+    def _async_cancel_stale_expiry(self) -> None:
+        """Cancel the pending expiry of the last good value."""
+        if self._unsub_stale is not None:
+            self._unsub_stale()
+            self._unsub_stale = None
@@ -4,17 +4,23 @@ from __future__ import annotations
 from collections.abc import Callable
 import dataclasses
 from dataclasses import dataclass
+from typing import Any
 
 from homeassistant.components.binary_sensor import BinarySensorEntityDescription
 from homeassistant.components.sensor import SensorEntityDescription
 from homeassistant.components.switch import SwitchEntityDescription
 from homeassistant.helpers.entity import EntityDescription
 
+from .const import STALE_MAX_AGE
+
 
 @dataclass
 class ProxmoxEntityDescription(EntityDescription):
     """Describe a Proxmox entity."""
 
+    # Seconds the last good value is shown while the updates fail
+    stale_max_age: int = STALE_MAX_AGE
+
 
 @dataclass
 class ProxmoxBinarySensorDescription(BinarySensorEntityDescription):
@@ -45,6 +51,39 @@ class ProxmoxSwitchDescription(SwitchEntityDescription):
 
 
 @dataclasses.dataclass
+class ProxmoxCacheStats:
+    """Hits and misses of a cache."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float | None:
+        """Return the share of lookups served from the cache."""
+        if not (lookups := self.hits + self.misses):
+            return None
+        return self.hits / lookups
+
+
+@dataclasses.dataclass
+class ProxmoxPollStats:
+    """API usage of one coordinator update."""
+
+    requests: int = 0
+    bytes_received: int = 0
+    duration: float = 0
+
+
+@dataclasses.dataclass
+class ProxmoxClusterData:
+    """Snapshot of the Proxmox API cluster resources."""
+
+    resources: list[dict[str, Any]]
+    nodes: dict[str, dict[str, Any]]
+    guests: dict[int, dict[str, Any]]
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
 class ProxmoxNodeData:
     """Data parsed from the Proxmox API for Node."""
 
@@ -63,14 +102,14 @@ class ProxmoxNodeData:
     swap_used: float
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True, slots=True)
 class ProxmoxVMData:
     """Data parsed from the Proxmox API for QEMU."""
 
     name: str
     status: str
     node: str
-    health: str
+    health: str | None
     uptime: int
     cpu: float
     memory_total: float
@@ -82,7 +121,7 @@ class ProxmoxVMData:
     disk_used: float
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True, slots=True)
 class ProxmoxLXCData:
     """Data parsed from the Proxmox API for LXC."""
 
@@ -13,27 +13,30 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import PERCENTAGE, UnitOfInformation
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.const import PERCENTAGE, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 import homeassistant.util.dt as dt_util
 
 from . import device_info
+from .api import ProxmoxClient
 from .const import (
-    CONF_LXC,
-    CONF_NODES,
-    CONF_QEMU,
     COORDINATORS,
     DOMAIN,
     LOGGER,
+    SIGNAL_RESOURCES_ADDED,
+    STALE_MAX_AGE_STATIC,
+    ProxmoxCircuitState,
     ProxmoxKeyAPIParse,
     ProxmoxType,
 )
+from .coordinator import ProxmoxCoordinator, ProxmoxNodeCoordinator
 from .entity import ProxmoxEntity
-from .models import ProxmoxEntityDescription
+from .models import ProxmoxEntityDescription, ProxmoxPollStats
 
 
 @dataclass
@@ -42,6 +45,12 @@ class ProxmoxSensorEntityDescription(ProxmoxEntityDescription, SensorEntityDescr
 
     conversion_fn: Callable | None = None  # conversion factor to be applied to units
     value_fn: Callable[[Any], bool | str] | None = None
+    poll_fn: Callable[
+        [ProxmoxPollStats], StateType
+    ] | None = None  # Reads the API usage of the last update instead of the data
+    client_fn: Callable[
+        [ProxmoxClient, str], StateType
+    ] | None = None  # Reads the API client state for the node instead of the data
     api_category: ProxmoxType | None = None  # Set when the sensor applies to only QEMU or LXC, if None applies to both.
 
 
@@ -68,6 +77,7 @@ PROXMOX_SENSOR_NODES: Final[tuple[ProxmoxSensorEntityDescription, ...]] = (
     ),
     ProxmoxSensorEntityDescription(
         key=ProxmoxKeyAPIParse.DISK_TOTAL,
+        stale_max_age=STALE_MAX_AGE_STATIC,
         name="Disk total",
         icon="mdi:harddisk",
         native_unit_of_measurement=UnitOfInformation.BYTES,
@@ -123,6 +133,7 @@ PROXMOX_SENSOR_NODES: Final[tuple[ProxmoxSensorEntityDescription, ...]] = (
     ),
     ProxmoxSensorEntityDescription(
         key=ProxmoxKeyAPIParse.MEMORY_TOTAL,
+        stale_max_age=STALE_MAX_AGE_STATIC,
         name="Memory total",
         icon="mdi:memory",
         native_unit_of_measurement=UnitOfInformation.BYTES,
@@ -177,6 +188,7 @@ PROXMOX_SENSOR_NODES: Final[tuple[ProxmoxSensorEntityDescription, ...]] = (
     ),
     ProxmoxSensorEntityDescription(
         key=ProxmoxKeyAPIParse.SWAP_TOTAL,
+        stale_max_age=STALE_MAX_AGE_STATIC,
         name="Swap total",
         icon="mdi:memory",
         native_unit_of_measurement=UnitOfInformation.BYTES,
@@ -205,6 +217,48 @@ PROXMOX_SENSOR_NODES: Final[tuple[ProxmoxSensorEntityDescription, ...]] = (
         ),
         device_class=SensorDeviceClass.TIMESTAMP,
     ),
+    ProxmoxSensorEntityDescription(
+        key="poll_duration",
+        name="Poll duration",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        poll_fn=lambda poll: poll.duration * 1000,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ProxmoxSensorEntityDescription(
+        key="poll_requests",
+        name="API requests per poll",
+        icon="mdi:api",
+        poll_fn=lambda poll: poll.requests,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ProxmoxSensorEntityDescription(
+        key="poll_bytes_received",
+        name="Bytes received per poll",
+        icon="mdi:download-network-outline",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        poll_fn=lambda poll: poll.bytes_received,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ProxmoxSensorEntityDescription(
+        key="api_circuit_breaker",
+        name="API circuit breaker",
+        icon="mdi:electric-switch",
+        client_fn=lambda client, node: client.circuit_state(f"nodes/{node}/"),
+        device_class=SensorDeviceClass.ENUM,
+        options=[state.value for state in ProxmoxCircuitState],
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
 )
 
 
@@ -221,6 +275,7 @@ PROXMOX_SENSOR_VM: Final[tuple[ProxmoxSensorEntityDescription, ...]] = (
     ),
     ProxmoxSensorEntityDescription(
         key=ProxmoxKeyAPIParse.DISK_TOTAL,
+        stale_max_age=STALE_MAX_AGE_STATIC,
         name="Disk total",
         icon="mdi:harddisk-plus",
         native_unit_of_measurement=UnitOfInformation.BYTES,
@@ -283,6 +338,7 @@ PROXMOX_SENSOR_VM: Final[tuple[ProxmoxSensorEntityDescription, ...]] = (
     ),
     ProxmoxSensorEntityDescription(
         key=ProxmoxKeyAPIParse.MEMORY_TOTAL,
+        stale_max_age=STALE_MAX_AGE_STATIC,
         name="Memory total",
         icon="mdi:memory",
         native_unit_of_measurement=UnitOfInformation.BYTES,
@@ -336,6 +392,7 @@ PROXMOX_SENSOR_VM: Final[tuple[ProxmoxSensorEntityDescription, ...]] = (
     ),
     ProxmoxSensorEntityDescription(
         key="node",
+        stale_max_age=STALE_MAX_AGE_STATIC,
         name="Node",
         icon="mdi:server",
     ),
@@ -372,6 +429,7 @@ PROXMOX_SENSOR_VM: Final[tuple[ProxmoxSensorEntityDescription, ...]] = (
     ),
     ProxmoxSensorEntityDescription(
         key=ProxmoxKeyAPIParse.SWAP_TOTAL,
+        stale_max_age=STALE_MAX_AGE_STATIC,
         name="Swap total",
         icon="mdi:memory",
         native_unit_of_measurement=UnitOfInformation.BYTES,
@@ -413,75 +471,59 @@ async def async_setup_entry(
 ) -> None:
     """Set up sensor."""
 
-    sensors = []
-
     coordinators = hass.data[DOMAIN][config_entry.entry_id][COORDINATORS]
 
-    for node in config_entry.data[CONF_NODES]:
-        coordinator = coordinators[node]
-        # unfound vm case
-        if coordinator.data is not None:
-            for description in PROXMOX_SENSOR_NODES:
-                sensors.append(
-                    create_sensor(
-                        coordinator=coordinator,
-                        info_device=device_info(
-                            hass=hass,
-                            config_entry=config_entry,
-                            api_category=ProxmoxType.Node,
-                            node=node,
-                        ),
-                        description=description,
-                        vm_id=None,
-                        config_entry=config_entry,
-                    )
-                )
-
-    for vm_id in config_entry.data[CONF_QEMU]:
-        coordinator = coordinators[vm_id]
-        # unfound vm case
-        if coordinator.data is None:
-            continue
-        for description in PROXMOX_SENSOR_VM:
-            if description.api_category in (None, ProxmoxType.QEMU):
-                sensors.append(
-                    create_sensor(
-                        coordinator=coordinator,
-                        info_device=device_info(
-                            hass=hass,
+    @callback
+    def async_add_resources(resource_coordinators: list[ProxmoxCoordinator]) -> None:
+        """Add the sensors of the nodes and guests."""
+        sensors = []
+        for coordinator in resource_coordinators:
+            # unfound resource case
+            if coordinator.data is None:
+                continue
+            if isinstance(coordinator, ProxmoxNodeCoordinator):
+                for description in PROXMOX_SENSOR_NODES:
+                    sensors.append(
+                        create_sensor(
+                            coordinator=coordinator,
+                            info_device=device_info(
+                                hass=hass,
+                                config_entry=config_entry,
+                                api_category=ProxmoxType.Node,
+                                node=coordinator.node_name,
+                            ),
+                            description=description,
+                            vm_id=coordinator.node_name,
                             config_entry=config_entry,
-                            api_category=ProxmoxType.QEMU,
-                            vm_id=vm_id,
-                        ),
-                        description=description,
-                        vm_id=vm_id,
-                        config_entry=config_entry,
+                        )
                     )
-                )
-
-    for ct_id in config_entry.data[CONF_LXC]:
-        coordinator = coordinators[ct_id]
-        # unfound container case
-        if coordinator.data is None:
-            continue
-        for description in PROXMOX_SENSOR_VM:
-            if description.api_category in (None, ProxmoxType.LXC):
-                sensors.append(
-                    create_sensor(
-                        coordinator=coordinator,
-                        info_device=device_info(
-                            hass=hass,
+                continue
+            for description in PROXMOX_SENSOR_VM:
+                if description.api_category in (None, coordinator.api_category):
+                    sensors.append(
+                        create_sensor(
+                            coordinator=coordinator,
+                            info_device=device_info(
+                                hass=hass,
+                                config_entry=config_entry,
+                                api_category=coordinator.api_category,
+                                vm_id=coordinator.vm_id,
+                            ),
+                            description=description,
+                            vm_id=coordinator.vm_id,
                             config_entry=config_entry,
-                            api_category=ProxmoxType.LXC,
-                            vm_id=ct_id,
-                        ),
-                        description=description,
-                        vm_id=ct_id,
-                        config_entry=config_entry,
+                        )
                     )
-                )
+        async_add_entities(sensors)
 
-    async_add_entities(sensors)
+    async_add_resources(list(coordinators.values()))
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_RESOURCES_ADDED.format(config_entry.entry_id),
+            async_add_resources,
+        )
+    )
 
 
 def create_sensor(
@@ -518,12 +560,35 @@ class ProxmoxSensorEntity(ProxmoxEntity, SensorEntity):
         self._attr_device_info = info_device
         self.entity_description = description
 
+    async def async_added_to_hass(self) -> None:
+        """Follow every poll when the sensor reads the API usage."""
+        await super().async_added_to_hass()
+        if (
+            self.entity_description.poll_fn is not None
+            or self.entity_description.client_fn is not None
+        ):
+            self.async_on_remove(
+                self.coordinator.async_add_poll_listener(
+                    self._handle_coordinator_update
+                )
+            )
+
     @property
     def native_value(self) -> StateType:
         """Return the units of the sensor."""
+        if (client_fn := self.entity_description.client_fn) is not None:
+            return client_fn(
+                self.coordinator.proxmox_client, self.coordinator.node_name
+            )
+
         if (data := self.coordinator.data) is None:
             return None
 
+        if (poll_fn := self.entity_description.poll_fn) is not None:
+            if (poll := getattr(self.coordinator, "last_poll", None)) is None:
+                return None
+            return poll_fn(poll)
+
         if not getattr(data, self.entity_description.key, False):
             if value := self.entity_description.value_fn:
                 native_value = value(data)
@@ -544,4 +609,8 @@ class ProxmoxSensorEntity(ProxmoxEntity, SensorEntity):
     def available(self) -> bool:
         """Return sensor availability."""
 
+        # The API client state is known even when the updates fail
+        if self.entity_description.client_fn is not None:
+            return True
+
         return super().available and self.coordinator.data is not None
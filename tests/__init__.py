@@ -0,0 +1 @@
+"""Tests for the Proxmox VE integration."""
@@ -0,0 +1,72 @@
+"""Fixtures for the Proxmox VE tests."""
+from __future__ import annotations
+
+from collections.abc import Generator
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from benchmarks.fake_pve import FakeProxmoxCluster, FakeProxmoxServer
+from custom_components.proxmoxve.const import (
+    CONF_LXC,
+    CONF_NODES,
+    CONF_QEMU,
+    CONF_REALM,
+    DOMAIN,
+)
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable the loading of the integration."""
+    yield
+
+
+@pytest.fixture
+def fake_cluster() -> FakeProxmoxCluster:
+    """Return a small simulated cluster."""
+    return FakeProxmoxCluster(nodes=2, guests=4, seed=0)
+
+
+@pytest.fixture
+def fake_server(
+    fake_cluster: FakeProxmoxCluster, socket_enabled: None
+) -> Generator[FakeProxmoxServer, None, None]:
+    """Serve the simulated cluster over the Proxmox VE API."""
+    server = FakeProxmoxServer(fake_cluster, seed=0)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def config_entry(
+    fake_cluster: FakeProxmoxCluster, fake_server: FakeProxmoxServer
+) -> MockConfigEntry:
+    """Return a config entry exposing the whole simulated cluster."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        version=4,
+        title=f"127.0.0.1:{fake_server.port}",
+        data={
+            "host": "127.0.0.1",
+            "port": fake_server.port,
+            "username": "root",
+            "password": "secret",
+            CONF_REALM: "pam",
+            "verify_ssl": False,
+            CONF_NODES: fake_cluster.nodes,
+            CONF_QEMU: [
+                str(vm_id)
+                for vm_id, guest in fake_cluster.guests.items()
+                if guest["type"] == "qemu"
+            ],
+            CONF_LXC: [
+                str(vm_id)
+                for vm_id, guest in fake_cluster.guests.items()
+                if guest["type"] == "lxc"
+            ],
+        },
+    )
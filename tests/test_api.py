@@ -0,0 +1,99 @@
+"""Tests for the Proxmox VE API clients."""
+from __future__ import annotations
+
+import asyncio
+
+import aiohttp
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import HomeAssistant
+
+from benchmarks.fake_pve import FakeProxmoxServer
+from custom_components.proxmoxve.api import (
+    TICKET_RENEW_AGE,
+    ProxmoxAsyncAPI,
+    ProxmoxClient,
+    endpoint_path,
+)
+from custom_components.proxmoxve.const import CONF_ASYNC_CLIENT, DOMAIN, PROXMOX_CLIENT
+
+
+async def test_concurrent_requests_login_once(fake_server: FakeProxmoxServer) -> None:
+    """Test concurrent requests share the login of a missing, old or rejected ticket."""
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(ssl=False)
+    ) as session:
+        api = ProxmoxAsyncAPI(
+            session, "127.0.0.1", fake_server.port, "root@pam", "secret"
+        )
+
+        async def async_poll() -> None:
+            await asyncio.gather(
+                *(
+                    api.async_get("nodes", node, "status")
+                    for node in fake_server.cluster.nodes * 5
+                )
+            )
+
+        await async_poll()
+        assert fake_server.requests["POST /access/ticket"] == 1
+
+        api._ticket_birth -= TICKET_RENEW_AGE
+        await async_poll()
+        assert fake_server.requests["POST /access/ticket"] == 2
+
+        fake_server.expire_ticket()
+        await async_poll()
+        assert fake_server.requests["POST /access/ticket"] == 3
+
+
+async def test_session_closed_with_home_assistant(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    fake_server: FakeProxmoxServer,
+) -> None:
+    """Test the session of the aiohttp client is closed with Home Assistant."""
+    hass.config_entries.async_update_entry(
+        config_entry, data={**config_entry.data, CONF_ASYNC_CLIENT: True}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    session = hass.data[DOMAIN][config_entry.entry_id][PROXMOX_CLIENT]._session
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    await hass.async_block_till_done()
+    assert session.closed
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+def test_endpoint_stats_keyed_by_endpoint() -> None:
+    """Test the requests of the guests and tasks share the stats of their endpoint."""
+    assert (
+        endpoint_path("nodes/pve1/qemu/100/status/reboot")
+        == "nodes/pve1/qemu/{vmid}/status/reboot"
+    )
+    assert (
+        endpoint_path(
+            "nodes/pve1/tasks/UPID:pve1:0001:0002:0003:qmreboot:100:root@pam:/status"
+        )
+        == "nodes/pve1/tasks/{upid}/status"
+    )
+    assert endpoint_path("nodes/pve1/lxc") == "nodes/pve1/lxc"
+
+    client = ProxmoxClient("127.0.0.1", "root", "secret")
+    for vm_id in range(100, 200):
+        client._record("POST", f"nodes/pve1/lxc/{vm_id}/status/start", 0.1, 10, False)
+        client._record(
+            "GET", f"nodes/pve1/tasks/UPID:pve1:{vm_id}:/status", 0.1, 10, False
+        )
+    assert set(client.endpoint_stats) == {
+        "POST nodes/pve1/lxc/{vmid}/status/start",
+        "GET nodes/pve1/tasks/{upid}/status",
+    }
+    assert (
+        client.endpoint_stats["POST nodes/pve1/lxc/{vmid}/status/start"].requests == 100
+    )
@@ -0,0 +1,56 @@
+"""Tests for the commands sent to the Proxmox VE guests."""
+from __future__ import annotations
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from benchmarks.fake_pve import FakeProxmoxServer
+from custom_components.proxmoxve.const import (
+    ATTR_COMMAND,
+    ATTR_VMIDS,
+    DOMAIN,
+    SERVICE_BULK_COMMAND,
+)
+
+
+async def test_bulk_command_unknown_vmids(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    fake_server: FakeProxmoxServer,
+) -> None:
+    """Test the bulk command fails without sending when a vmid is unknown."""
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    vm_id = next(iter(fake_server.cluster.guests))
+
+    with pytest.raises(HomeAssistantError, match="999"):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_BULK_COMMAND,
+            {ATTR_COMMAND: "reboot", ATTR_VMIDS: [vm_id, 999]},
+            blocking=True,
+        )
+    assert not any(
+        endpoint.startswith("POST /nodes/") for endpoint in fake_server.requests
+    )
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_BULK_COMMAND,
+        {ATTR_COMMAND: "reboot", ATTR_VMIDS: [vm_id]},
+        blocking=True,
+    )
+    guest = fake_server.cluster.guests[vm_id]
+    assert (
+        fake_server.requests[
+            f"POST /nodes/{guest['node']}/{guest['type']}/{{vmid}}/status/reboot"
+        ]
+        == 1
+    )
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,215 @@
+"""Tests for the Proxmox VE data update coordinators."""
+from __future__ import annotations
+
+import dataclasses
+from datetime import timedelta
+from unittest.mock import AsyncMock, Mock, patch
+
+from aiohttp import web
+from freezegun.api import FrozenDateTimeFactory
+from requests.exceptions import ConnectionError as connError
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import STATE_UNKNOWN
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from benchmarks.fake_pve import FakeProxmoxServer
+from custom_components.proxmoxve.const import (
+    CLUSTER_COORDINATOR,
+    CONF_ALL_GUESTS,
+    COORDINATORS,
+    DOMAIN,
+    LOGGER,
+)
+from custom_components.proxmoxve.coordinator import (
+    ProxmoxCoordinator,
+    ProxmoxUpdateSchedule,
+)
+
+
+def test_schedule_delay_on_phase(freezer: FrozenDateTimeFactory) -> None:
+    """Test the delay until the next update lands on the shifted grid."""
+    schedule = ProxmoxUpdateSchedule(60, 300)
+    schedule.phase = 0.5
+    interval = timedelta(seconds=60)
+
+    freezer.move_to("2023-06-01 12:00:50+00:00")
+    assert schedule.delay(interval) == timedelta(seconds=40)
+
+    # The grid point at 12:01:30 is too close, the next one is used
+    freezer.move_to("2023-06-01 12:01:10+00:00")
+    assert schedule.delay(interval) == timedelta(seconds=80)
+
+
+async def test_retry_interval_backs_off(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    fake_server: FakeProxmoxServer,
+) -> None:
+    """Test the retries of the failed updates back off up to the interval."""
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][config_entry.entry_id][CLUSTER_COORDINATOR]
+
+    fake_server.error_rate = 1
+    intervals = []
+    for _ in range(6):
+        await coordinator.async_refresh()
+        assert not coordinator.last_update_success
+        intervals.append(coordinator.update_interval)
+    assert intervals == [
+        timedelta(seconds=seconds) for seconds in (5, 10, 20, 40, 60, 60)
+    ]
+
+    fake_server.error_rate = 0
+    coordinator.proxmox_client.circuit_breakers.clear()
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert timedelta(seconds=30) <= coordinator.update_interval <= timedelta(seconds=90)
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_connection_error_retried(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    fake_server: FakeProxmoxServer,
+) -> None:
+    """Test an unreachable host makes the updates fail and back off."""
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    cluster_coordinator = entry_data[CLUSTER_COORDINATOR]
+    node_coordinator = entry_data[COORDINATORS][fake_server.cluster.nodes[0]]
+
+    with patch.object(
+        cluster_coordinator.proxmox_client,
+        "async_get",
+        side_effect=connError("refused"),
+    ):
+        for coordinator in (cluster_coordinator, node_coordinator):
+            await coordinator.async_refresh()
+            assert isinstance(coordinator.last_exception, UpdateFailed)
+            assert coordinator.update_interval == timedelta(seconds=5)
+            await coordinator.async_refresh()
+            assert coordinator.update_interval == timedelta(seconds=10)
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_new_guest_gets_guest_list_fields(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    fake_server: FakeProxmoxServer,
+) -> None:
+    """Test a guest found at runtime has the guest list fields on its first update."""
+    hass.config_entries.async_update_entry(
+        config_entry, data={**config_entry.data, CONF_ALL_GUESTS: True}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+
+    guests = fake_server.cluster.guests
+    for vm_id, api_category in ((200, "qemu"), (201, "lxc")):
+        guests[vm_id] = {
+            **guests[100],
+            "vmid": vm_id,
+            "type": api_category,
+            "name": f"guest{vm_id}",
+            "status": "running",
+        }
+    await entry_data[CLUSTER_COORDINATOR].async_refresh()
+    await hass.async_block_till_done()
+
+    assert entry_data[COORDINATORS]["200"].data.health == "running"
+    lxc_data = entry_data[COORDINATORS]["201"].data
+    assert lxc_data.swap_total == guests[201]["maxswap"]
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_guest_health_unknown_without_qmpstatus(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    fake_server: FakeProxmoxServer,
+) -> None:
+    """Test the health of a VM is unknown when its guest list fails."""
+    cluster_get = fake_server.cluster.get
+
+    def get(path: str) -> object:
+        if path.endswith("/qemu"):
+            raise web.HTTPNotFound()
+        return cluster_get(path)
+
+    config_entry.add_to_hass(hass)
+    with patch.object(fake_server.cluster, "get", get):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+    coordinators = hass.data[DOMAIN][config_entry.entry_id][COORDINATORS]
+
+    assert coordinators["102"].data.status == "running"
+    assert coordinators["102"].data.health is None
+    assert hass.states.get("binary_sensor.qemu_guest102_102_health").state == (
+        STATE_UNKNOWN
+    )
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_node_missing_from_cluster_resources(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    fake_server: FakeProxmoxServer,
+) -> None:
+    """Test the update of a node missing from the cluster resources fails."""
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    cluster_coordinator = entry_data[CLUSTER_COORDINATOR]
+    node = fake_server.cluster.nodes[0]
+    coordinator = entry_data[COORDINATORS][node]
+
+    cluster_coordinator.data = dataclasses.replace(cluster_coordinator.data, nodes={})
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert isinstance(coordinator.last_exception, UpdateFailed)
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_unchanged_data_notifies_poll_listeners(hass: HomeAssistant) -> None:
+    """Test an update with the same data only notifies the poll listeners."""
+    coordinator = ProxmoxCoordinator(
+        hass, LOGGER, name="test", update_method=AsyncMock(return_value=(1, 2))
+    )
+    listener = Mock()
+    poll_listener = Mock()
+    remove_listener = coordinator.async_add_listener(listener)
+    remove_poll_listener = coordinator.async_add_poll_listener(poll_listener)
+
+    await coordinator.async_refresh()
+    assert listener.call_count == 1
+    assert poll_listener.call_count == 0
+
+    await coordinator.async_refresh()
+    assert listener.call_count == 1
+    assert poll_listener.call_count == 1
+
+    coordinator.update_method.return_value = (1, 3)
+    await coordinator.async_refresh()
+    assert listener.call_count == 2
+    assert poll_listener.call_count == 1
+
+    remove_poll_listener()
+    remove_listener()
@@ -0,0 +1,51 @@
+"""Smoke test the integration against the fake Proxmox VE server."""
+from __future__ import annotations
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+
+from benchmarks.fake_pve import FakeProxmoxServer
+from custom_components.proxmoxve.const import (
+    CLUSTER_COORDINATOR,
+    CONF_ASYNC_CLIENT,
+    COORDINATORS,
+    DOMAIN,
+)
+
+
+@pytest.mark.parametrize("async_client", [False, True])
+async def test_poll_cycle(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    fake_server: FakeProxmoxServer,
+    async_client: bool,
+) -> None:
+    """Set up the integration and run one poll cycle of every coordinator."""
+    hass.config_entries.async_update_entry(
+        config_entry, data={**config_entry.data, CONF_ASYNC_CLIENT: async_client}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert config_entry.state is ConfigEntryState.LOADED
+
+    fake_server.reset_counters()
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    for coordinator in (
+        entry_data[CLUSTER_COORDINATOR],
+        *entry_data[COORDINATORS].values(),
+    ):
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+    await hass.async_block_till_done()
+
+    assert fake_server.requests["GET /cluster/resources"] >= 1
+    for node in fake_server.cluster.nodes:
+        assert fake_server.requests[f"GET /nodes/{node}/status"] >= 1
+    assert hass.states.async_entity_ids()
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
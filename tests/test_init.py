@@ -0,0 +1,135 @@
+"""Tests for the setup of the Proxmox VE integration."""
+from __future__ import annotations
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+from benchmarks.fake_pve import FakeProxmoxCluster
+from custom_components.proxmoxve import (
+    async_update_exposed_resources,
+    async_update_guests,
+    exposed_guests,
+)
+from custom_components.proxmoxve.const import (
+    CLUSTER_COORDINATOR,
+    CONF_NODES,
+    COORDINATORS,
+    DOMAIN,
+    ProxmoxType,
+)
+
+
+async def test_remove_exposed_node(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    fake_cluster: FakeProxmoxCluster,
+) -> None:
+    """Test a node removed from the exposed resources stops being polled."""
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinators = hass.data[DOMAIN][config_entry.entry_id][COORDINATORS]
+    removed, kept = fake_cluster.nodes
+    coordinator = coordinators[removed]
+
+    hass.config_entries.async_update_entry(
+        config_entry, data={**config_entry.data, CONF_NODES: [kept]}
+    )
+    await async_update_exposed_resources(hass, config_entry)
+    # The entities are removed after their registry entries, on a later event
+    await hass.async_block_till_done()
+    await hass.async_block_till_done()
+
+    assert removed not in coordinators
+    assert kept in coordinators
+    assert coordinator.update_interval is None
+    assert not coordinator._listeners
+    device_registry = dr.async_get(hass)
+    assert not device_registry.async_get_device(
+        {(DOMAIN, f"{config_entry.entry_id}_{ProxmoxType.Node.upper()}_{removed}")}
+    )
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_migrate_node_unique_ids(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    fake_cluster: FakeProxmoxCluster,
+) -> None:
+    """Test the node name replaces None in the unique ID of the node sensors."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, version=3, title=config_entry.title, data=config_entry.data
+    )
+    config_entry.add_to_hass(hass)
+    node = fake_cluster.nodes[1]
+    device = dr.async_get(hass).async_get_or_create(
+        config_entry_id=config_entry.entry_id,
+        identifiers={
+            (DOMAIN, f"{config_entry.entry_id}_{ProxmoxType.Node.upper()}_{node}")
+        },
+    )
+    entity_registry = er.async_get(hass)
+    entity = entity_registry.async_get_or_create(
+        "sensor",
+        DOMAIN,
+        f"{config_entry.entry_id}_None_cpu",
+        config_entry=config_entry,
+        device_id=device.id,
+    )
+
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert config_entry.version == 4
+    assert (
+        entity_registry.async_get(entity.entity_id).unique_id
+        == f"{config_entry.entry_id}_{node}_cpu"
+    )
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_guest_coordinators_detached(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test the guest coordinators are detached when removed or unloaded."""
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    cluster_coordinator = entry_data[CLUSTER_COORDINATOR]
+    coordinators = entry_data[COORDINATORS]
+    guests = exposed_guests(config_entry, cluster_coordinator.data)
+    vm_id = next(iter(guests))
+    removed = coordinators[vm_id]
+    on_unload = len(config_entry._on_unload)
+
+    async_update_guests(
+        hass,
+        config_entry,
+        cluster_coordinator,
+        coordinators,
+        {key: value for key, value in guests.items() if key != vm_id},
+    )
+    async_update_guests(hass, config_entry, cluster_coordinator, coordinators, guests)
+    # The entities are removed after their registry entries, on a later event
+    await hass.async_block_till_done()
+    await hass.async_block_till_done()
+
+    assert removed._unsub_cluster is None
+    assert coordinators[vm_id] is not removed
+    assert len(config_entry._on_unload) == on_unload
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert all(
+        coordinator._unsub_cluster is None
+        for coordinator in coordinators.values()
+        if hasattr(coordinator, "_unsub_cluster")
+    )